@@ -1,10 +1,11 @@
 import pandas as pd
 import numpy as np
 from faker import Faker
-import random
-from datetime import datetime, timedelta
-import json
+from datetime import datetime
+import orjson
 import os
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 from typing import Dict, List, Any
 
 # Initialize Faker for Indian locale
@@ -12,6 +13,7 @@ fake = Faker('en_IN')
 
 # Configuration
 TOTAL_PROVIDERS = 500
+SEED = 42
 QUALITY_DISTRIBUTION = {
     'complete': 0.60,
     'incomplete': 0.20,
@@ -102,187 +104,351 @@ LANGUAGES = {
     'Telangana': ['English', 'Hindi', 'Telugu']
 }
 
-def generate_phone(quality: str) -> str:
-    if quality == 'complete':
-        return f"+91 {random.randint(7000000000, 9999999999)}"
-    elif quality == 'outdated':
-        return f"+91 5555555555"
-    elif quality == 'errors':
-        return str(random.randint(1000000, 9999999))
-    return ""
-
-def generate_email(first_name: str, last_name: str, quality: str) -> str:
-    if quality == 'complete':
-        domains = ['gmail.com', 'yahoo.com', 'outlook.com', 'hotmail.com']
-        return f"dr.{first_name.lower()}.{last_name.lower()}@{random.choice(domains)}"
-    elif quality == 'outdated':
-        return f"old_{first_name.lower()}@email.com"
-    elif quality == 'errors':
-        return f"{first_name.lower()}@invalid"
-    return ""
-
-def generate_registration_number(state: str, quality: str) -> str:
-    if quality == 'complete':
-        state_code = state[:2].upper()
-        return f"{state_code}/{random.randint(10000, 99999)}"
-    elif quality == 'errors':
-        return "ERROR/12345"
-    return f"{state[:2].upper()}/{random.randint(10000, 99999)}"
-
-def introduce_typo(text: str) -> str:
-    if not text:
-        return text
-    if len(text) < 4:
-        return text
-    
-    # Common typo patterns
-    pos = random.randint(0, len(text)-1)
-    typos = [
-        lambda t, p: t[:p] + t[p+1:],  # deletion
-        lambda t, p: t[:p] + random.choice('abcdefghijklmnopqrstuvwxyz') + t[p:],  # insertion
-        lambda t, p: t[:p] + t[p+1] + t[p] + t[p+2:] if p < len(t)-1 else t  # transposition
-    ]
-    return random.choice(typos)(text, pos)
-
-def generate_provider(idx: int, quality: str) -> Dict[str, Any]:
-    gender = random.choice(['M', 'F'])
-    first_name = random.choice(MALE_FIRST_NAMES if gender == 'M' else FEMALE_FIRST_NAMES)
-    last_name = random.choice(LAST_NAMES)
-    city = random.choice(list(CITIES_AND_AREAS.keys()))
-    state = STATE_MAPPING[city]
-    area = random.choice(CITIES_AND_AREAS[city])
-    specialty = random.choice(SPECIALTIES)
-    
-    if quality == 'errors':
-        first_name = introduce_typo(first_name)
-        last_name = introduce_typo(last_name)
-    
-    provider = {
+# Lookup tables derived once from the reference data above
+_CITY_LIST = tuple(CITIES_AND_AREAS.keys())
+_SUBSPEC_OR_SELF = {s: tuple(SUBSPECIALTIES.get(s, (s,))) for s in SPECIALTIES}
+_LANG_JOINED = {state: ", ".join(langs) for state, langs in LANGUAGES.items()}
+
+# Per-city arrays indexed by city code (position in _CITY_LIST); variable-length
+# pools are flattened into values plus offsets so a whole column is one fancy-index
+_CITY_ARR = np.array(_CITY_LIST)
+_STATE_BY_CITY = np.array([STATE_MAPPING[c] for c in _CITY_LIST])
+_LANG_BY_CITY = np.array([_LANG_JOINED[STATE_MAPPING[c]] for c in _CITY_LIST])
+_AREA_OFFS = np.cumsum([0] + [len(CITIES_AND_AREAS[c]) for c in _CITY_LIST])
+_AREA_FLAT = np.array([a for c in _CITY_LIST for a in CITIES_AND_AREAS[c]])
+_HOSP_OFFS = np.cumsum([0] + [len(HOSPITALS[c]) for c in _CITY_LIST])
+_HOSP_FLAT = np.array([h for c in _CITY_LIST for h in HOSPITALS[c]])
+
+# Single seeded generator for all randomness, so datasets are reproducible
+RNG = np.random.default_rng(SEED)
+fake.seed_instance(SEED)
+
+def _cat(*parts) -> np.ndarray:
+    """Element-wise concatenation of string arrays and scalars"""
+    out = parts[0]
+    for part in parts[1:]:
+        out = np.char.add(out, part)
+    return out
+
+def _choice_by_key(rng: np.random.Generator, keys: np.ndarray, pools: Dict[str, List[str]],
+                   default: str = '') -> np.ndarray:
+    """Draw one value per row from the pool registered for that row's key"""
+    out = np.full(len(keys), default, dtype=object)
+    for key, pool in pools.items():
+        mask = keys == key
+        out[mask] = rng.choice(pool, size=mask.sum())
+    return out
+
+def _jagged_choice(rng: np.random.Generator, offsets: np.ndarray, flat: np.ndarray,
+                   codes: np.ndarray) -> np.ndarray:
+    """Draw one value per row from the flattened pool segment selected by its code"""
+    start = offsets[codes]
+    return flat[start + rng.integers(0, offsets[codes + 1] - start)]
+
+def _fake_column(method, n: int) -> np.ndarray:
+    """Call a bound Faker provider method n times in one batch.
+
+    Faker has no vectorized API; binding the method once keeps the provider
+    lookup out of the loop.
+    """
+    return np.array([method() for _ in range(n)])
+
+def _sample_join(rng: np.random.Generator, pool: List[str], sizes: np.ndarray) -> List[str]:
+    """Join a per-row sample (without replacement) of `sizes[i]` items from pool"""
+    pool = np.asarray(pool, dtype=object)
+    order = np.argsort(rng.random((len(sizes), len(pool))), axis=1)
+    return [", ".join(pool[row[:k]]) for row, k in zip(order, sizes)]
+
+def _dispatch(builders: Dict[str, Any], quality: np.ndarray, rng: np.random.Generator,
+              *columns: np.ndarray) -> np.ndarray:
+    """Build a column by running each quality's builder on that quality's rows only.
+
+    Builders are looked up by quality instead of evaluating every branch for
+    every row; each one is called as builder(n, rng, *columns_for_its_rows).
+    """
+    out = np.empty(len(quality), dtype=object)
+    for name in QUALITY_DISTRIBUTION:
+        mask = quality == name
+        out[mask] = builders[name](mask.sum(), rng, *(column[mask] for column in columns))
+    return out
+
+def _phone_complete(n, rng):
+    return np.char.add('+91 ', rng.integers(7000000000, 10000000000, size=n).astype(str))
+
+def _phone_error(n, rng):
+    return rng.integers(1000000, 10000000, size=n).astype(str)
+
+_PHONE_BUILDERS = {
+    'complete': _phone_complete,
+    'outdated': lambda n, rng: np.full(n, '+91 5555555555'),
+    'errors': _phone_error,
+    'incomplete': lambda n, rng: np.full(n, '')
+}
+
+def _email_complete(n, rng, first, last):
+    domains = rng.choice(['gmail.com', 'yahoo.com', 'outlook.com', 'hotmail.com'], size=n)
+    return _cat('dr.', np.char.lower(first), '.', np.char.lower(last), '@', domains)
+
+_EMAIL_BUILDERS = {
+    'complete': _email_complete,
+    'outdated': lambda n, rng, first, last: _cat('old_', np.char.lower(first), '@email.com'),
+    'errors': lambda n, rng, first, last: np.char.add(np.char.lower(first), '@invalid'),
+    'incomplete': lambda n, rng, first, last: np.full(n, '')
+}
+
+def _registration_number(n, rng, states):
+    # Casting to '<U2' keeps the first two characters of each state name
+    state_codes = np.char.upper(states.astype('<U2'))
+    return _cat(state_codes, '/', rng.integers(10000, 100000, size=n).astype(str))
+
+_REGISTRATION_BUILDERS = {
+    'complete': _registration_number,
+    'outdated': _registration_number,
+    'errors': lambda n, rng, states: np.full(n, 'ERROR/12345'),
+    'incomplete': _registration_number
+}
+
+def generate_phones(quality: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    return _dispatch(_PHONE_BUILDERS, quality, rng)
+
+def generate_emails(first_names: np.ndarray, last_names: np.ndarray, quality: np.ndarray,
+                    rng: np.random.Generator) -> np.ndarray:
+    return _dispatch(_EMAIL_BUILDERS, quality, rng, first_names, last_names)
+
+def generate_registration_numbers(states: np.ndarray, quality: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    return _dispatch(_REGISTRATION_BUILDERS, quality, rng, states)
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the kernel below also runs as plain Python
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+@njit(cache=True)
+def _typo_kernel(buf: np.ndarray, pos: int, op: int, letter: int) -> np.ndarray:
+    """Apply one typo to an ASCII buffer: op 0 deletes, 1 inserts `letter`, 2 transposes"""
+    n = buf.shape[0]
+    if n < 4:
+        return buf.copy()
+    if op == 0:
+        out = np.empty(n - 1, np.uint8)
+        out[:pos] = buf[:pos]
+        out[pos:] = buf[pos + 1:]
+    elif op == 1:
+        out = np.empty(n + 1, np.uint8)
+        out[:pos] = buf[:pos]
+        out[pos] = letter
+        out[pos + 1:] = buf[pos:]
+    else:
+        out = buf.copy()
+        if pos < n - 1:
+            out[pos] = buf[pos + 1]
+            out[pos + 1] = buf[pos]
+    return out
+
+def introduce_typo(text: str, pos: int, op: int, letter: int) -> str:
+    """Apply one typo at `pos` to an ASCII name; `letter` is the codepoint to insert"""
+    buf = np.frombuffer(text.encode('ascii'), dtype=np.uint8).copy()
+    return _typo_kernel(buf, pos, op, letter).tobytes().decode('ascii')
+
+def _apply_typos(names: np.ndarray, mask: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    # Draw every typo's position, kind and inserted letter in one batch
+    m = int(mask.sum())
+    positions = (rng.random(m) * np.char.str_len(names[mask])).astype(int)
+    ops = rng.integers(0, 3, size=m)
+    letters = rng.integers(ord('a'), ord('z') + 1, size=m)
+    # Typos change string lengths, so go through an object array for the masked rows
+    out = names.astype(object)
+    out[mask] = [introduce_typo(name, int(pos), int(op), int(letter))
+                 for name, pos, op, letter in zip(out[mask], positions, ops, letters)]
+    return out.astype(str)
+
+def generate_providers(total_records: Dict[str, int], rng: np.random.Generator) -> pd.DataFrame:
+    """Generate the whole synthetic dataset column by column.
+
+    Every field is drawn as a length-N array in one call instead of building
+    one dict per provider; rows are shuffled once at the end.
+    """
+    quality = np.repeat(list(total_records.keys()), list(total_records.values()))
+    n = len(quality)
+    ids = np.arange(1, n + 1)
+    is_complete = quality == 'complete'
+    is_outdated = quality == 'outdated'
+    is_errors = quality == 'errors'
+
+    genders = rng.choice(['M', 'F'], size=n)
+    first_names = np.where(genders == 'M', rng.choice(MALE_FIRST_NAMES, size=n),
+                           rng.choice(FEMALE_FIRST_NAMES, size=n))
+    last_names = rng.choice(LAST_NAMES, size=n)
+    city_codes = rng.integers(0, len(_CITY_LIST), size=n)
+    cities = _CITY_ARR[city_codes]
+    states = _STATE_BY_CITY[city_codes]
+    specialties = rng.choice(SPECIALTIES, size=n)
+
+    first_names = _apply_typos(first_names, is_errors, rng)
+    last_names = _apply_typos(last_names, is_errors, rng)
+    last_lower = np.char.lower(last_names)
+
+    addresses = _fake_column(fake.street_address, n)
+    # Error rows get a short, invalid PIN instead of a Faker postcode
+    pin_codes = rng.integers(1000, 10000, size=n).astype(str).astype(object)
+    pin_codes[~is_errors] = _fake_column(fake.postcode, n - is_errors.sum())
+
+    today = np.datetime64(datetime.now().date(), 'D')
+    dates_of_birth = (today - rng.integers(30 * 365, 71 * 365, size=n).astype('timedelta64[D]')).astype(str)
+
+    clinical_focus = np.empty(n, dtype=object)
+    for specialty, pool in _SUBSPEC_OR_SELF.items():
+        mask = specialties == specialty
+        sizes = np.minimum(len(pool), rng.integers(1, 4, size=mask.sum()))
+        clinical_focus[mask] = _sample_join(rng, pool, sizes)
+
+    columns = {
         # Demographics
-        'provider_id': f"PRV{idx:06d}",
-        'registration_number': generate_registration_number(state, quality),
-        'first_name': first_name,
-        'last_name': last_name,
-        'full_name': f"Dr. {first_name} {last_name}",
-        'gender': gender,
-        'date_of_birth': fake.date_of_birth(minimum_age=30, maximum_age=70).strftime('%Y-%m-%d'),
-        'profile_photo_url': "" if random.random() < 0.7 else f"https://provider-photos.healthverify.ai/{idx}.jpg",
+        'provider_id': _cat('PRV', np.char.zfill(ids.astype(str), 6)),
+        'registration_number': generate_registration_numbers(states, quality, rng),
+        'first_name': first_names,
+        'last_name': last_names,
+        'full_name': _cat('Dr. ', first_names, ' ', last_names),
+        'gender': genders,
+        'date_of_birth': dates_of_birth,
+        'profile_photo_url': np.where(rng.random(n) < 0.7, '',
+                                      _cat('https://provider-photos.healthverify.ai/', ids.astype(str), '.jpg')),
 
         # Contact Information
-        'practice_name': f"Dr. {last_name}'s {specialty} Clinic" + (" (CLOSED)" if quality == 'outdated' else ""),
-        'practice_address': fake.street_address() + (" (MOVED)" if quality == 'outdated' else ""),
-        'area': area,
-        'city': city,
-        'state': state,
-        'pin_code': fake.postcode() if quality != 'errors' else str(random.randint(1000, 9999)),
-        'phone': generate_phone(quality),
-        'alternate_phone': generate_phone(quality) if random.random() < 0.3 else "",
-        'email': generate_email(first_name, last_name, quality),
-        'website': f"https://dr{last_name.lower()}.com" if quality == 'complete' and random.random() < 0.3 else "",
+        'practice_name': np.char.add(_cat('Dr. ', last_names, "'s ", specialties, ' Clinic'),
+                                     np.where(is_outdated, ' (CLOSED)', '')),
+        'practice_address': np.char.add(addresses, np.where(is_outdated, ' (MOVED)', '')),
+        'area': _jagged_choice(rng, _AREA_OFFS, _AREA_FLAT, city_codes),
+        'city': cities,
+        'state': states,
+        'pin_code': pin_codes,
+        'phone': generate_phones(quality, rng),
+        'alternate_phone': np.where(rng.random(n) < 0.3, generate_phones(quality, rng), ''),
+        'email': generate_emails(first_names, last_names, quality, rng),
+        'website': np.where(is_complete & (rng.random(n) < 0.3), _cat('https://dr', last_lower, '.com'), ''),
 
         # Professional Details
-        'specialty': specialty,
-        'sub_specialty': random.choice(SUBSPECIALTIES.get(specialty, [''])) if specialty in SUBSPECIALTIES else "",
-        'qualification': random.choice(['MBBS', 'MD', 'MS', 'DNB']),
-        'medical_school': random.choice(MEDICAL_SCHOOLS),
-        'graduation_year': random.randint(1985, 2020),
-        'license_number': generate_registration_number(state, quality),
-        'license_state': state,
-        'license_status': 'Active' if quality != 'outdated' else 'Expired',
-        'board_certification': random.choice(['MCI', 'DNB', 'MRCP']),
-        'certification_year': random.randint(1990, 2022),
+        'specialty': specialties,
+        'sub_specialty': _choice_by_key(rng, specialties, SUBSPECIALTIES),
+        'qualification': rng.choice(['MBBS', 'MD', 'MS', 'DNB'], size=n),
+        'medical_school': rng.choice(MEDICAL_SCHOOLS, size=n),
+        'graduation_year': rng.integers(1985, 2021, size=n),
+        'license_number': generate_registration_numbers(states, quality, rng),
+        'license_state': states,
+        'license_status': np.where(is_outdated, 'Expired', 'Active'),
+        'board_certification': rng.choice(['MCI', 'DNB', 'MRCP'], size=n),
+        'certification_year': rng.integers(1990, 2023, size=n),
 
         # Network Affiliations
-        'hospital_affiliation': random.choice(HOSPITALS[city]),
-        'group_practice': f"{last_name} Medical Associates" if random.random() < 0.4 else "",
-        'insurance_networks': ", ".join(random.sample(INSURANCE_NETWORKS, random.randint(2, 5))),
-        'empanelment_status': random.choice(['Empanelled', 'Not Empanelled', 'Pending']),
-        'network_tier': f"Tier {random.randint(1, 3)}",
+        'hospital_affiliation': _jagged_choice(rng, _HOSP_OFFS, _HOSP_FLAT, city_codes),
+        'group_practice': np.where(rng.random(n) < 0.4, np.char.add(last_names, ' Medical Associates'), ''),
+        'insurance_networks': _sample_join(rng, INSURANCE_NETWORKS, rng.integers(2, 6, size=n)),
+        'empanelment_status': rng.choice(['Empanelled', 'Not Empanelled', 'Pending'], size=n),
+        'network_tier': np.char.add('Tier ', rng.integers(1, 4, size=n).astype(str)),
 
         # Services
-        'clinical_focus': ", ".join(random.sample(SUBSPECIALTIES.get(specialty, [specialty]), min(len(SUBSPECIALTIES.get(specialty, [specialty])), random.randint(1, 3)))),
+        'clinical_focus': clinical_focus,
         'procedures_offered': "General Consultation, Specialty Procedures",
-        'consultation_fee': random.randint(500, 5000),
-        'appointment_availability': 'Not Accepting' if quality == 'outdated' else random.choice(['Available', 'Limited']),
-        'teleconsultation_available': random.choice(['Yes', 'No']),
-        'emergency_services': random.choice(['Yes', 'No']),
+        'consultation_fee': rng.integers(500, 5001, size=n),
+        'appointment_availability': np.where(is_outdated, 'Not Accepting', rng.choice(['Available', 'Limited'], size=n)),
+        'teleconsultation_available': rng.choice(['Yes', 'No'], size=n),
+        'emergency_services': rng.choice(['Yes', 'No'], size=n),
 
         # Location and Facilities
-        'facility_type': random.choice(['Clinic', 'Hospital', 'Diagnostic Center', 'Multi-specialty']),
-        'diagnostic_facilities': ", ".join(random.sample(['X-Ray', 'CT Scan', 'MRI', 'Ultrasound', 'Lab'], random.randint(1, 5))),
-        'parking_available': random.choice(['Yes', 'No']),
-        'wheelchair_accessible': random.choice(['Yes', 'No']),
+        'facility_type': rng.choice(['Clinic', 'Hospital', 'Diagnostic Center', 'Multi-specialty'], size=n),
+        'diagnostic_facilities': _sample_join(rng, ['X-Ray', 'CT Scan', 'MRI', 'Ultrasound', 'Lab'],
+                                              rng.integers(1, 6, size=n)),
+        'parking_available': rng.choice(['Yes', 'No'], size=n),
+        'wheelchair_accessible': rng.choice(['Yes', 'No'], size=n),
 
         # Additional Metadata
-        'languages_spoken': ", ".join(LANGUAGES[state]),
-        'accepting_new_patients': 'No' if quality == 'outdated' else random.choice(['Yes', 'Limited']),
+        'languages_spoken': _LANG_BY_CITY[city_codes],
+        'accepting_new_patients': np.where(is_outdated, 'No', rng.choice(['Yes', 'Limited'], size=n)),
         'data_quality_flag': quality,
-        'created_date': (datetime.now() - timedelta(days=random.randint(1, 730))).strftime('%Y-%m-%d'),
-        'last_verified_date': (datetime.now() - timedelta(days=random.randint(1, 90))).strftime('%Y-%m-%d'),
-        'last_updated_date': datetime.now().strftime('%Y-%m-%d')
+        'created_date': (today - rng.integers(1, 731, size=n).astype('timedelta64[D]')).astype(str),
+        'last_verified_date': (today - rng.integers(1, 91, size=n).astype('timedelta64[D]')).astype(str),
+        'last_updated_date': np.full(n, str(today))
     }
 
-    # Apply quality-specific modifications
-    if quality == 'incomplete':
-        optional_fields = ['website', 'alternate_phone', 'group_practice', 'sub_specialty',
-                         'profile_photo_url', 'diagnostic_facilities']
-        for field in random.sample(optional_fields, random.randint(2, 4)):
-            provider[field] = ""
+    # Apply quality-specific modifications: blank 2-4 random optional fields per incomplete row
+    optional_fields = ['website', 'alternate_phone', 'group_practice', 'sub_specialty',
+                       'profile_photo_url', 'diagnostic_facilities']
+    incomplete = np.flatnonzero(quality == 'incomplete')
+    ranks = np.argsort(np.argsort(rng.random((len(incomplete), len(optional_fields))), axis=1), axis=1)
+    blanked = ranks < rng.integers(2, 5, size=len(incomplete))[:, None]
+    for j, field in enumerate(optional_fields):
+        column = np.asarray(columns[field], dtype=object)
+        column[incomplete[blanked[:, j]]] = ""
+        columns[field] = column
 
-    return provider
+    # Assemble the frame once from the finished columns
+    df = pd.DataFrame(columns, copy=False)
+
+    # Shuffle the providers to mix quality types
+    return df.iloc[rng.permutation(n)].reset_index(drop=True)
 
-def save_to_csv(data: List[Dict[str, Any]], filename: str = 'Indian_providers.csv'):
-    df = pd.DataFrame(data)
-    df.to_csv(filename, index=False, encoding='utf-8')
+def save_to_csv(df: pd.DataFrame, filename: str = 'Indian_providers.csv'):
+    pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), filename)
     print(f"CSV file saved: {filename}")
 
-def save_to_excel(data: List[Dict[str, Any]], filename: str = 'Indian_providers.xlsx'):
-    df = pd.DataFrame(data)
+def save_to_excel(df: pd.DataFrame, filename: str = 'Indian_providers.xlsx'):
+    # Grouping on categorical codes partitions the frame in one pass; empty
+    # categories still yield (empty) groups and keep the sheet order stable
+    quality = pd.Categorical(df['data_quality_flag'], categories=list(QUALITY_DISTRIBUTION))
     
-    # Create Excel writer object
-    with pd.ExcelWriter(filename, engine='openpyxl') as writer:
+    # Create Excel writer object. xlsxwriter's constant_memory mode is not
+    # used: pandas writes cells column by column, which that mode drops.
+    with pd.ExcelWriter(filename, engine='xlsxwriter') as writer:
         # Write all data
         df.to_excel(writer, sheet_name='All Providers', index=False)
         
         # Write quality-specific sheets
-        for quality in ['complete', 'incomplete', 'outdated', 'errors']:
-            quality_df = df[df['data_quality_flag'] == quality]
-            quality_df.to_excel(writer, sheet_name=quality.capitalize(), index=False)
+        for name, quality_df in df.groupby(quality, observed=False):
+            quality_df.to_excel(writer, sheet_name=name.capitalize(), index=False)
     
     print(f"Excel file saved: {filename}")
 
-def save_to_json(data: List[Dict[str, Any]], filename: str = 'Indian_providers.json'):
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+def save_to_json(df: pd.DataFrame, filename: str = 'Indian_providers.json'):
+    with open(filename, 'wb') as f:
+        f.write(orjson.dumps(df.to_dict(orient='records'), option=orjson.OPT_INDENT_2))
     print(f"JSON file saved: {filename}")
 
-def print_statistics(data: List[Dict[str, Any]]):
-    df = pd.DataFrame(data)
+def save_to_ndjson(df: pd.DataFrame, filename: str = 'Indian_providers.ndjson'):
+    # One record per line, streamed without building a single pretty-printed buffer
+    with open(filename, 'wb') as f:
+        for record in df.to_dict(orient='records'):
+            f.write(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+    print(f"NDJSON file saved: {filename}")
+
+def print_statistics(df: pd.DataFrame):
+    total = len(df)
+    distributions = {col: df[col].value_counts() for col in ('data_quality_flag', 'city', 'specialty')}
     
     print("\n=== Dataset Statistics ===")
-    print(f"\nTotal Providers: {len(df)}")
+    print(f"\nTotal Providers: {total}")
     
     print("\nQuality Distribution:")
-    quality_dist = df['data_quality_flag'].value_counts()
-    for quality, count in quality_dist.items():
-        print(f"{quality.capitalize()}: {count} ({count/len(df)*100:.1f}%)")
+    for quality, count in distributions['data_quality_flag'].items():
+        print(f"{quality.capitalize()}: {count} ({count/total*100:.1f}%)")
     
     print("\nGeographic Distribution:")
-    city_dist = df['city'].value_counts()
-    for city, count in city_dist.items():
-        print(f"{city}: {count} ({count/len(df)*100:.1f}%)")
+    for city, count in distributions['city'].items():
+        print(f"{city}: {count} ({count/total*100:.1f}%)")
     
     print("\nSpecialty Distribution:")
-    specialty_dist = df['specialty'].value_counts().head(10)
     print("Top 10 Specialties:")
-    for specialty, count in specialty_dist.items():
+    for specialty, count in distributions['specialty'].head(10).items():
         print(f"{specialty}: {count}")
     
     print("\nData Completeness:")
-    null_counts = df.isnull().sum()
-    if null_counts.any():
+    # One boolean pass finds the columns with gaps; only those get counted
+    null_cols = df.columns[df.isna().any()]
+    if len(null_cols):
         print("\nFields with missing values:")
-        for field, count in null_counts[null_counts > 0].items():
+        for field, count in df[null_cols].isna().sum().items():
             print(f"{field}: {count} missing")
     else:
         print("No missing values in required fields")
@@ -298,25 +464,16 @@ def main():
                                    - int(TOTAL_PROVIDERS * QUALITY_DISTRIBUTION['outdated'])
     }
     
-    providers = []
-    idx = 1
-    
-    # Generate providers for each quality type
-    for quality, count in total_records.items():
-        for _ in range(count):
-            providers.append(generate_provider(idx, quality))
-            idx += 1
-    
-    # Shuffle the providers to mix quality types
-    random.shuffle(providers)
+    df = generate_providers(total_records, RNG)
     
     # Save in different formats
-    save_to_csv(providers)
-    save_to_excel(providers)
-    save_to_json(providers)
+    save_to_csv(df)
+    save_to_excel(df)
+    save_to_json(df)
+    save_to_ndjson(df)
     
     # Print statistics
-    print_statistics(providers)
+    print_statistics(df)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
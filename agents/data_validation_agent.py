@@ -3,17 +3,11 @@ Agent 1: Data Validation Agent
 Validates provider contact information using public APIs and web sources
 """
 import time
-import sys
-import os
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, List
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from services.npi_service import NPIService
-from services.location_service import LocationService
-from services.phone_service import PhoneService
-from services.web_scraper import WebScraper
-from utils.confidence_scorer import ConfidenceScorer
-from fuzzywuzzy import fuzz
+from typing import Dict, Any, List, Optional
+from config import MAX_CONCURRENT_VALIDATIONS
 
 
 class DataValidationAgent:
@@ -21,14 +15,57 @@ class DataValidationAgent:
     AGENT NAME: Data Validation Agent
     AGENT ID: DVA-001
     PRIMARY FUNCTION: Validate provider contact information using public APIs and web sources
+    
+    Service clients are imported and created lazily on first use so that
+    importing this module does not pull in requests/BeautifulSoup/numpy.
     """
     
     def __init__(self):
-        self.npi_service = NPIService()
-        self.location_service = LocationService()
-        self.phone_service = PhoneService()
-        self.web_scraper = WebScraper()
-        self.confidence_scorer = ConfidenceScorer()
+        self._npi_service = None
+        self._location_service = None
+        self._phone_service = None
+        self._web_scraper = None
+        self._confidence_scorer = None
+        # Shared pool for the four independent per-provider lookups
+        self._step_executor = ThreadPoolExecutor(
+            max_workers=4 * MAX_CONCURRENT_VALIDATIONS,
+            thread_name_prefix='dva-step'
+        )
+    
+    @property
+    def npi_service(self):
+        if self._npi_service is None:
+            from services.npi_service import NPIService
+            self._npi_service = NPIService()
+        return self._npi_service
+    
+    @property
+    def location_service(self):
+        if self._location_service is None:
+            from services.location_service import LocationService
+            self._location_service = LocationService()
+        return self._location_service
+    
+    @property
+    def phone_service(self):
+        if self._phone_service is None:
+            from services.phone_service import PhoneService
+            self._phone_service = PhoneService()
+        return self._phone_service
+    
+    @property
+    def web_scraper(self):
+        if self._web_scraper is None:
+            from services.web_scraper import WebScraper
+            self._web_scraper = WebScraper()
+        return self._web_scraper
+    
+    @property
+    def confidence_scorer(self):
+        if self._confidence_scorer is None:
+            from utils.confidence_scorer import ConfidenceScorer
+            self._confidence_scorer = ConfidenceScorer()
+        return self._confidence_scorer
     
     def validate_provider(self, provider_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -59,24 +96,31 @@ class DataValidationAgent:
         }
         
         try:
+            # Steps 1-4 have no data dependency on each other, so the remote
+            # lookups run concurrently and are collected in order
+            npi_future = self._step_executor.submit(self._validate_npi, provider_data)
+            address_future = self._step_executor.submit(self._validate_address, provider_data)
+            phone_future = self._step_executor.submit(self._validate_phone, provider_data)
+            web_future = self._step_executor.submit(self._validate_web_presence, provider_data)
+            
             # Step 1: NPI Validation (HIGHEST PRIORITY)
-            npi_validation = self._validate_npi(provider_data)
+            npi_validation = npi_future.result()
             validation_result['validations']['npi'] = npi_validation
             validation_result['sources_used'].append(npi_validation.get('source', 'NPI Registry (CMS)'))
             
             # Step 2: Address Validation
-            address_validation = self._validate_address(provider_data)
+            address_validation = address_future.result()
             validation_result['validations']['address'] = address_validation
             if address_validation.get('source'):
                 validation_result['sources_used'].append(address_validation['source'])
             
             # Step 3: Phone Number Validation
-            phone_validation = self._validate_phone(provider_data)
+            phone_validation = phone_future.result()
             validation_result['validations']['phone'] = phone_validation
             validation_result['sources_used'].append(phone_validation.get('source', 'NumVerify API'))
             
             # Step 4: Web Presence Verification
-            web_validation = self._validate_web_presence(provider_data)
+            web_validation = web_future.result()
             validation_result['validations']['website'] = web_validation
             if web_validation.get('source'):
                 validation_result['sources_used'].append(web_validation['source'])
@@ -99,6 +143,18 @@ class DataValidationAgent:
             validation_result['validation_duration_seconds'] = round(time.time() - start_time, 2)
             return validation_result
     
+    async def validate_provider_async(self, provider_data: Dict[str, Any],
+                                      executor: Optional[Executor] = None) -> Dict[str, Any]:
+        """
+        Awaitable wrapper around validate_provider for the app's event loop
+        
+        The service clients are blocking, so the provider is validated on
+        `executor` (the loop's default executor if None) and the coroutine
+        only holds a frame while the lookups are in flight.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.validate_provider, provider_data)
+    
     def _validate_npi(self, provider_data: Dict[str, Any]) -> Dict[str, Any]:
         """Step 1: NPI Validation"""
         npi = provider_data.get('npi', '')
@@ -179,150 +235,111 @@ class DataValidationAgent:
             full_name, city, state, phone, full_address
         )
     
+    @staticmethod
+    def _mk_flag(provider_id: str, flag_type: str, severity: str, field: str,
+                 message: str, details: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a flag dictionary"""
+        return {
+            'provider_id': provider_id,
+            'flag_type': flag_type,
+            'severity': severity,
+            'field': field,
+            'message': message,
+            'details': details
+        }
+    
     def _generate_flags(self, validation_result: Dict[str, Any], provider_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Step 6: Flag Generation"""
         flags = []
         validations = validation_result.get('validations', {})
         provider_id = validation_result.get('provider_id', '')
+        mk_flag = self._mk_flag
         
-        # CRITICAL FLAGS
         npi_validation = validations.get('npi', {})
-        if not npi_validation.get('valid'):
-            flags.append({
-                'provider_id': provider_id,
-                'flag_type': 'CRITICAL',
-                'severity': 'high',
-                'field': 'npi',
-                'message': 'NPI not found in registry or invalid',
-                'details': {
-                    'error': npi_validation.get('error', 'Unknown error'),
-                    'npi': provider_data.get('npi', '')
-                }
-            })
+        address_validation = validations.get('address', {})
+        phone_validation = validations.get('phone', {})
+        web_validation = validations.get('website', {})
+        
+        npi_valid = npi_validation.get('valid', False)
+        addr_valid = address_validation.get('valid', False)
+        phone_valid = phone_validation.get('valid', False)
+        web_valid = web_validation.get('valid', False)
+        addr_conf = address_validation.get('confidence', 0)
+        web_conf = web_validation.get('confidence', 0)
+        
+        # CRITICAL FLAGS
+        if not npi_valid:
+            flags.append(mk_flag(provider_id, 'CRITICAL', 'high', 'npi',
+                                 'NPI not found in registry or invalid', {
+                                     'error': npi_validation.get('error', 'Unknown error'),
+                                     'npi': provider_data.get('npi', '')
+                                 }))
         elif not npi_validation.get('matches_input', True):
-            flags.append({
-                'provider_id': provider_id,
-                'flag_type': 'CRITICAL',
-                'severity': 'high',
-                'field': 'npi',
-                'message': 'NPI belongs to different provider - name mismatch',
-                'details': {
-                    'input_name': provider_data.get('full_name', ''),
-                    'npi_name': npi_validation.get('verified_data', {}).get('name', '')
-                }
-            })
+            flags.append(mk_flag(provider_id, 'CRITICAL', 'high', 'npi',
+                                 'NPI belongs to different provider - name mismatch', {
+                                     'input_name': provider_data.get('full_name', ''),
+                                     'npi_name': npi_validation.get('verified_data', {}).get('name', '')
+                                 }))
         
         # Address validation flags
-        address_validation = validations.get('address', {})
-        if not address_validation.get('valid'):
-            flags.append({
-                'provider_id': provider_id,
-                'flag_type': 'CRITICAL',
-                'severity': 'high',
-                'field': 'address',
-                'message': 'Address completely invalid or cannot be geocoded',
-                'details': {
-                    'error': address_validation.get('error', 'Unknown error'),
-                    'input_address': f"{provider_data.get('practice_address', '')}, {provider_data.get('city', '')}, {provider_data.get('state', '')}"
-                }
-            })
-        elif address_validation.get('confidence', 0) < 60:
-            flags.append({
-                'provider_id': provider_id,
-                'flag_type': 'WARNING',
-                'severity': 'medium',
-                'field': 'address',
-                'message': 'Address partial match only - verify address',
-                'details': {
-                    'confidence': address_validation.get('confidence', 0),
-                    'match_quality': address_validation.get('verified_data', {}).get('match_quality', 'unknown')
-                }
-            })
+        if not addr_valid:
+            flags.append(mk_flag(provider_id, 'CRITICAL', 'high', 'address',
+                                 'Address completely invalid or cannot be geocoded', {
+                                     'error': address_validation.get('error', 'Unknown error'),
+                                     'input_address': f"{provider_data.get('practice_address', '')}, {provider_data.get('city', '')}, {provider_data.get('state', '')}"
+                                 }))
+        elif addr_conf < 60:
+            flags.append(mk_flag(provider_id, 'WARNING', 'medium', 'address',
+                                 'Address partial match only - verify address', {
+                                     'confidence': addr_conf,
+                                     'match_quality': address_validation.get('verified_data', {}).get('match_quality', 'unknown')
+                                 }))
         
         # Phone validation flags
-        phone_validation = validations.get('phone', {})
-        if not phone_validation.get('valid'):
-            flags.append({
-                'provider_id': provider_id,
-                'flag_type': 'WARNING',
-                'severity': 'medium',
-                'field': 'phone',
-                'message': 'Phone number validation failed',
-                'details': {
-                    'error': phone_validation.get('error', 'Unknown error'),
-                    'input_phone': provider_data.get('phone', '')
-                }
-            })
+        if not phone_valid:
+            flags.append(mk_flag(provider_id, 'WARNING', 'medium', 'phone',
+                                 'Phone number validation failed', {
+                                     'error': phone_validation.get('error', 'Unknown error'),
+                                     'input_phone': provider_data.get('phone', '')
+                                 }))
         else:
             phone_data = phone_validation.get('verified_data', {})
             if phone_data.get('line_type') == 'unknown' and not phone_data.get('carrier'):
-                flags.append({
-                    'provider_id': provider_id,
-                    'flag_type': 'WARNING',
-                    'severity': 'medium',
-                    'field': 'phone',
-                    'message': 'Phone number may be disconnected - carrier unknown',
-                    'details': {
-                        'line_type': phone_data.get('line_type', 'unknown')
-                    }
-                })
+                flags.append(mk_flag(provider_id, 'WARNING', 'medium', 'phone',
+                                     'Phone number may be disconnected - carrier unknown', {
+                                         'line_type': phone_data.get('line_type', 'unknown')
+                                     }))
         
         # Website flags
-        web_validation = validations.get('website', {})
-        if not web_validation.get('valid'):
-            flags.append({
-                'provider_id': provider_id,
-                'flag_type': 'INFO',
-                'severity': 'low',
-                'field': 'website',
-                'message': 'No website found for provider',
-                'details': {
-                    'error': web_validation.get('error', 'No website found')
-                }
-            })
-        elif web_validation.get('confidence', 0) < 60:
-            flags.append({
-                'provider_id': provider_id,
-                'flag_type': 'WARNING',
-                'severity': 'medium',
-                'field': 'website',
-                'message': 'Website information contradicts input data',
-                'details': {
-                    'confidence': web_validation.get('confidence', 0),
-                    'matches': web_validation.get('matches', [])
-                }
-            })
+        if not web_valid:
+            flags.append(mk_flag(provider_id, 'INFO', 'low', 'website',
+                                 'No website found for provider', {
+                                     'error': web_validation.get('error', 'No website found')
+                                 }))
+        elif web_conf < 60:
+            flags.append(mk_flag(provider_id, 'WARNING', 'medium', 'website',
+                                 'Website information contradicts input data', {
+                                     'confidence': web_conf,
+                                     'matches': web_validation.get('matches', [])
+                                 }))
         
         # Check for multiple data source conflicts
         valid_count = sum(1 for v in validations.values() if v.get('valid', False))
         if valid_count == 1 and len(validations) > 1:
-            flags.append({
-                'provider_id': provider_id,
-                'flag_type': 'WARNING',
-                'severity': 'medium',
-                'field': 'multiple',
-                'message': 'Multiple data source conflicts - only one source validated successfully',
-                'details': {
-                    'valid_sources': valid_count,
-                    'total_sources': len(validations)
-                }
-            })
+            flags.append(mk_flag(provider_id, 'WARNING', 'medium', 'multiple',
+                                 'Multiple data source conflicts - only one source validated successfully', {
+                                     'valid_sources': valid_count,
+                                     'total_sources': len(validations)
+                                 }))
         
         # Check if all contact methods failed
-        if not any([npi_validation.get('valid'), address_validation.get('valid'), 
-                   phone_validation.get('valid')]):
-            flags.append({
-                'provider_id': provider_id,
-                'flag_type': 'CRITICAL',
-                'severity': 'high',
-                'field': 'all',
-                'message': 'All contact methods failed validation',
-                'details': {
-                    'npi_valid': npi_validation.get('valid', False),
-                    'address_valid': address_validation.get('valid', False),
-                    'phone_valid': phone_validation.get('valid', False)
-                }
-            })
+        if not (npi_valid or addr_valid or phone_valid):
+            flags.append(mk_flag(provider_id, 'CRITICAL', 'high', 'all',
+                                 'All contact methods failed validation', {
+                                     'npi_valid': npi_valid,
+                                     'address_valid': addr_valid,
+                                     'phone_valid': phone_valid
+                                 }))
         
         return flags
     
@@ -330,15 +347,20 @@ class DataValidationAgent:
         """
         Validate multiple providers in batch
         
+        Validations are I/O-bound (remote API calls), so providers are
+        validated concurrently on a thread pool sized by
+        MAX_CONCURRENT_VALIDATIONS. Results keep the input order.
+        
         Args:
             providers: List of provider data dictionaries
             
         Returns:
             List of validation results
         """
-        results = []
-        for provider in providers:
-            result = self.validate_provider(provider)
-            results.append(result)
-        return results
+        if not providers:
+            return []
+        
+        max_workers = min(MAX_CONCURRENT_VALIDATIONS, len(providers))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(self.validate_provider, providers))
 
@@ -2,10 +2,8 @@
 Agent 4: Directory Management Agent
 Handles reporting and directory management
 """
-import sys
-import os
+import time
 from typing import Dict, Any, List
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.report_generator import ReportGenerator
 from utils.database import Database
 
@@ -13,9 +11,17 @@ from utils.database import Database
 class DirectoryAgent:
     """Agent for reporting and directory management"""
     
+    # Seconds a computed stats dict is served before querying again
+    STATS_TTL_SECONDS = 5
+    
     def __init__(self):
         self.report_generator = ReportGenerator()
         self.database = Database()
+        self._stats_cache = None  # (stats, expires_at)
+    
+    def invalidate_stats(self):
+        """Drop cached directory stats after providers or flags change"""
+        self._stats_cache = None
     
     def generate_report(self, validation_results: List[Dict[str, Any]], output_path: str) -> Dict[str, Any]:
         """Generate Excel report from validation results"""
@@ -34,14 +40,19 @@ class DirectoryAgent:
             }
     
     def get_directory_stats(self) -> Dict[str, Any]:
-        """Get directory statistics"""
-        providers = self.database.get_all_providers()
-        flags = self.database.get_flags(resolved=False)
+        """Get directory statistics (cached for STATS_TTL_SECONDS)"""
+        cached = self._stats_cache
+        if cached is not None and cached[1] > time.monotonic():
+            return dict(cached[0])
         
-        return {
-            'total_providers': len(providers),
-            'unresolved_flags': len(flags),
-            'critical_flags': len([f for f in flags if f.get('flag_type') == 'CRITICAL']),
-            'warning_flags': len([f for f in flags if f.get('flag_type') == 'WARNING'])
+        # Counted in SQL; statistics never need the rows themselves
+        flag_counts = self.database.count_flags_by_type(resolved=False)
+        
+        stats = {
+            'total_providers': self.database.count_providers(),
+            'unresolved_flags': sum(flag_counts.values()),
+            'critical_flags': flag_counts.get('CRITICAL', 0),
+            'warning_flags': flag_counts.get('WARNING', 0)
         }
-
+        self._stats_cache = (stats, time.monotonic() + self.STATS_TTL_SECONDS)
+        return dict(stats)
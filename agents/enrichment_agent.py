@@ -3,6 +3,7 @@ Agent 2: Enrichment Agent
 Enriches provider data using OCR and document extraction
 """
 from typing import Dict, Any
+import numpy as np
 from utils.file_processor import FileProcessor
 
 
@@ -24,16 +25,18 @@ class EnrichmentAgent:
     def enrich_from_document(self, document_path: str, provider_data: Dict[str, Any]) -> Dict[str, Any]:
         """Enrich provider data from a document using OCR and optional LLM extraction."""
         try:
-            # Use the FileProcessor to extract text (it will use remote OCR if configured)
-            df, metadata = self.file_processor.process_file(document_path)
+            # Use the FileProcessor to extract text (it will use remote OCR if configured).
+            # A document enriches a single provider, so only its first record is parsed.
+            df, metadata = self.file_processor.process_file_head(document_path, n=1)
 
             # Prefer a text column if present
             text = None
             if 'ocr_text' in df.columns:
                 text = df['ocr_text'].iloc[0]
             else:
-                # Join textual columns as fallback
-                text = '\n'.join(df.astype(str).apply(lambda row: ' | '.join(row.values), axis=1).tolist())
+                # Join textual columns as fallback, one column at a time
+                # rather than a Python callback per row
+                text = '\n'.join(self._join_columns(df))
 
             extracted_data = {}
 
@@ -69,3 +72,13 @@ class EnrichmentAgent:
                 'enriched_data': provider_data
             }
 
+    @staticmethod
+    def _join_columns(df) -> list:
+        """Return each row of df as its cell strings joined by ' | '."""
+        if df.shape[1] == 0:
+            return []
+        cells = df.to_numpy(dtype=str)
+        rows = cells[:, 0]
+        for idx in range(1, cells.shape[1]):
+            rows = np.char.add(np.char.add(rows, ' | '), cells[:, idx])
+        return rows.tolist()
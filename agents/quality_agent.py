@@ -2,10 +2,8 @@
 Agent 3: Quality Assurance Agent
 Performs quality assurance and scoring
 """
-import sys
-import os
+from collections import Counter
 from typing import Dict, Any, List
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.confidence_scorer import ConfidenceScorer
 
 
@@ -20,8 +18,9 @@ class QualityAgent:
         quality_score = validation_result.get('overall_confidence', 0)
         flags = validation_result.get('flags', [])
         
-        critical_count = len([f for f in flags if f.get('flag_type') == 'CRITICAL'])
-        warning_count = len([f for f in flags if f.get('flag_type') == 'WARNING'])
+        flag_counts = Counter(f.get('flag_type') for f in flags)
+        critical_count = flag_counts['CRITICAL']
+        warning_count = flag_counts['WARNING']
         
         quality_level = 'HIGH'
         if quality_score < 60 or critical_count > 0:
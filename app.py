@@ -2,12 +2,21 @@
 Flask main application for HealthVerify AI Provider Validation System
 """
 from flask import Flask, render_template, request, jsonify, redirect, url_for, send_file
+from flask.json.provider import JSONProvider
+import orjson
 import os
 import uuid
+import io
 import json
 from datetime import datetime
 from werkzeug.utils import secure_filename
+from streaming_form_data import StreamingFormDataParser
+from streaming_form_data.targets import FileTarget
 import threading
+import itertools
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import LRUCache
 
 import sys
 import os
@@ -15,7 +24,7 @@ import os
 project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
 
-from config import Config
+from config import Config, ALLOWED_EXTENSIONS, MAX_UPLOAD_SIZE, MAX_CONCURRENT_VALIDATIONS
 from utils.database import Database
 from utils.file_processor import FileProcessor
 from agents.data_validation_agent import DataValidationAgent
@@ -24,8 +33,22 @@ from agents.quality_agent import QualityAgent
 from agents.directory_agent import DirectoryAgent
 from utils.report_generator import ReportGenerator
 
+
+class ORJSONProvider(JSONProvider):
+    """Serve jsonify() responses through orjson, keeping Flask's sorted keys"""
+
+    option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
 app.config.from_object(Config)
+app.json = ORJSONProvider(app)
 
 # Initialize services
 db = Database()
@@ -36,12 +59,50 @@ quality_agent = QualityAgent()
 directory_agent = DirectoryAgent()
 report_generator = ReportGenerator()
 
+# Single event loop thread that runs every background validation job
+validation_loop = asyncio.new_event_loop()
+# Providers are validated on their own pool so the number in flight really is
+# MAX_CONCURRENT_VALIDATIONS; parsing and DB writes use the loop's default executor
+validation_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_VALIDATIONS,
+                                         thread_name_prefix='validation')
+threading.Thread(target=validation_loop.run_forever, name='validation-loop', daemon=True).start()
+
 # Ensure upload directory exists
 UPLOAD_FOLDER = os.path.join(project_root, 'data', 'uploads')
 RESULTS_FOLDER = os.path.join(project_root, 'data', 'validation_results')
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(RESULTS_FOLDER, exist_ok=True)
 
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+# Bytes read from the request stream per parser call
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Write job progress to the database every N completed providers
+PROGRESS_UPDATE_INTERVAL = 10
+# Flush buffered validation results/flags every N completed providers
+RESULT_FLUSH_INTERVAL = 50
+# Jobs whose results page data (rows + summary) is kept between views
+RESULTS_CACHE_SIZE = 32
+
+# job_id -> (results version, validation results, summary)
+_results_cache = LRUCache(maxsize=RESULTS_CACHE_SIZE)
+_results_cache_lock = threading.Lock()
+
+
+def get_job_results_with_summary(job_id):
+    """Latest results of a job and their summary, recomputed only after new results land"""
+    version = db.get_job_results_version(job_id)
+    with _results_cache_lock:
+        cached = _results_cache.get(job_id)
+    if cached is not None and cached[0] == version:
+        return cached[1], cached[2]
+    
+    validation_results = db.get_results_for_job(job_id)
+    summary = report_generator.generate_summary_report(validation_results)
+    # A result inserted since the version read only makes the next view recompute
+    with _results_cache_lock:
+        _results_cache[job_id] = (version, validation_results, summary)
+    return validation_results, summary
+
 
 @app.route('/')
 def index():
@@ -54,80 +115,91 @@ def dashboard():
     """Main dashboard with KPIs"""
     stats = directory_agent.get_directory_stats()
     
-    # Get recent validation results for summary
-    all_providers = db.get_all_providers()
-    recent_results = []
-    for provider in all_providers[:10]:  # Last 10 providers
-        result = db.get_validation_result(provider['provider_id'])
-        if result:
-            recent_results.append(result)
-    
-    # Calculate KPIs
-    total_providers = len(all_providers)
-    validated_count = sum(1 for r in recent_results if r.get('validation_status') == 'VALIDATED')
-    avg_confidence = sum(r.get('overall_confidence', 0) for r in recent_results) / len(recent_results) if recent_results else 0
+    # Recent validation results for the summary table; KPIs are aggregated in SQL
+    recent_results = db.get_recent_validation_results(limit=5)
+    totals = db.get_validation_kpis()
     
     kpis = {
-        'total_providers': total_providers,
-        'validated': validated_count,
-        'average_confidence': round(avg_confidence, 2),
+        'total_providers': totals['total_providers'],
+        'validated': totals['validated'],
+        'average_confidence': round(totals['average_confidence'], 2),
         'unresolved_flags': stats.get('unresolved_flags', 0),
         'critical_flags': stats.get('critical_flags', 0)
     }
     
-    return render_template('dashboard.html', kpis=kpis, recent_results=recent_results[:5])
+    return render_template('dashboard.html', kpis=kpis, recent_results=recent_results)
 
 
 @app.route('/upload', methods=['GET', 'POST'])
 def upload():
     """File upload page"""
     if request.method == 'POST':
-        if 'file' not in request.files:
+        if (request.content_length or 0) > MAX_UPLOAD_SIZE:
+            return jsonify({'error': 'File exceeds maximum upload size'}), 413
+        if request.mimetype != 'multipart/form-data':
             return jsonify({'error': 'No file provided'}), 400
         
-        file = request.files['file']
-        if file.filename == '':
+        # Stream the multipart body straight to disk instead of letting
+        # Werkzeug buffer it first; the final name is only known once the
+        # part headers have been parsed, so write to a temporary name.
+        temp_path = os.path.join(UPLOAD_FOLDER, f".upload-{uuid.uuid4().hex}")
+        target = FileTarget(temp_path)
+        # Content-Length is absent on chunked requests, so count the bytes too
+        received = 0
+        try:
+            # Raises on a malformed multipart header (e.g. missing boundary)
+            parser = StreamingFormDataParser(headers=request.headers)
+            parser.register('file', target)
+            while True:
+                chunk = request.stream.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                received += len(chunk)
+                if received > MAX_UPLOAD_SIZE:
+                    break
+                parser.data_received(chunk)
+        except Exception as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return jsonify({'error': f'Invalid upload: {e}'}), 400
+        if received > MAX_UPLOAD_SIZE:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return jsonify({'error': 'File exceeds maximum upload size'}), 413
+        
+        original_filename = target.multipart_filename or ''
+        if not os.path.exists(temp_path):
+            return jsonify({'error': 'No file provided'}), 400
+        if original_filename == '':
+            os.remove(temp_path)
             return jsonify({'error': 'No file selected'}), 400
         # Validate extension against allowed list
-        ext = file_processor.get_file_extension(file.filename)
-        if ext not in Config.ALLOWED_EXTENSIONS:
+        ext = file_processor.get_file_extension(original_filename)
+        if ext not in ALLOWED_EXTENSIONS:
+            os.remove(temp_path)
             return jsonify({'error': f'Invalid or unsupported file type: .{ext}'}), 400
 
         # Save file
-        filename = secure_filename(file.filename)
+        filename = secure_filename(original_filename)
         filepath = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(filepath)
+        os.replace(temp_path, filepath)
 
-        # Process file using FileProcessor (supports CSV, Excel, PDF, images, JSON)
+        # Parsing happens in the background job; respond as soon as the file is on disk
         try:
-            df, metadata = file_processor.process_file(filepath)
-            # Convert DataFrame rows to provider dicts
-            providers = df.to_dict(orient='records') if not df.empty else []
-
-            # Create job
             job_id = str(uuid.uuid4())
             job = {
                 'job_id': job_id,
                 'filename': filename,
-                'total_providers': len(providers),
-                'status': 'PENDING',
-                'file_metadata': metadata
+                'total_providers': 0,
+                'status': 'PARSING'
             }
             db.create_job(job)
 
-            # Store providers in database
-            for provider in providers:
-                db.insert_provider(provider)
-
-            # Start processing in background
-            thread = threading.Thread(target=process_providers_background, args=(job_id, providers))
-            thread.daemon = True
-            thread.start()
+            asyncio.run_coroutine_threadsafe(parse_and_process_job(job_id, filepath), validation_loop)
 
             return jsonify({
                 'success': True,
                 'job_id': job_id,
-                'total_providers': len(providers),
                 'redirect': url_for('processing', job_id=job_id)
             })
 
@@ -164,17 +236,8 @@ def results(job_id):
     if not job:
         return redirect(url_for('dashboard'))
     
-    # Get all providers for this job (simplified - in production would track by job)
-    all_providers = db.get_all_providers()
-    validation_results = []
-    
-    for provider in all_providers:
-        result = db.get_validation_result(provider['provider_id'])
-        if result:
-            validation_results.append(result)
-    
-    # Generate summary
-    summary = report_generator.generate_summary_report(validation_results)
+    # Latest result of each provider processed by this job, plus its summary
+    validation_results, summary = get_job_results_with_summary(job_id)
     
     return render_template('results.html', job_id=job_id, job=job, 
                          results=validation_results, summary=summary)
@@ -206,39 +269,28 @@ def export(job_id):
     if not job:
         return redirect(url_for('dashboard'))
     
-    # Get validation results
-    all_providers = db.get_all_providers()
-    validation_results = []
-    
-    for provider in all_providers:
-        result = db.get_validation_result(provider['provider_id'])
-        if result:
-            validation_results.append(result)
+    # Only the count is shown here, so let SQL do it
+    total_results = db.count_results_for_job(job_id)
     
     return render_template('export.html', job_id=job_id, job=job, 
-                         total_results=len(validation_results))
+                         total_results=total_results)
 
 
 @app.route('/api/export/<job_id>')
 def api_export(job_id):
     """API endpoint for exporting reports"""
     try:
-        # Get validation results
-        all_providers = db.get_all_providers()
-        validation_results = []
+        # Get validation results for this job (shared with the results page)
+        validation_results, _ = get_job_results_with_summary(job_id)
         
-        for provider in all_providers:
-            result = db.get_validation_result(provider['provider_id'])
-            if result:
-                validation_results.append(result)
-        
-        # Generate Excel report
+        # Generate Excel report in memory and stream it to the client
         output_filename = f"validation_report_{job_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        output_path = os.path.join(RESULTS_FOLDER, output_filename)
+        buffer = io.BytesIO()
         
-        report_generator.generate_excel_report(validation_results, output_path)
+        report_generator.generate_excel_report(validation_results, buffer)
+        buffer.seek(0)
         
-        return send_file(output_path, as_attachment=True, download_name=output_filename)
+        return send_file(buffer, as_attachment=True, download_name=output_filename, mimetype=XLSX_MIMETYPE)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -253,55 +305,125 @@ def api_validate_provider(provider_id):
     
     # Validate provider
     result = validation_agent.validate_provider(provider)
+    result['job_id'] = provider.get('job_id')
     
     # Store result
     db.insert_validation_result(result)
     
     # Store flags
-    for flag in result.get('flags', []):
-        db.insert_flag(flag)
+    db.insert_flags_bulk(result.get('flags', []))
+    directory_agent.invalidate_stats()
     
     return jsonify(result)
 
 
-def process_providers_background(job_id, providers):
-    """Background processing function"""
+def store_uploaded_providers(job_id, filepath):
+    """Parse an upload chunk by chunk, storing each chunk as soon as it is read
+
+    Returns every provider as a dict tagged with job_id, for the validators.
+    FileProcessor keeps per-call timing state, so concurrent parses get their own.
+    """
+    providers = []
+    for chunk in FileProcessor().iter_file_chunks(filepath):
+        if chunk.empty:
+            continue
+        db.insert_providers_bulk_from_df(chunk, job_id)
+        # The validators still take one dict per provider
+        records = chunk.to_dict(orient='records')
+        for provider in records:
+            provider['job_id'] = job_id
+        providers.extend(records)
+    return providers
+
+
+async def parse_and_process_job(job_id, filepath):
+    """Parse an uploaded file off the request thread, store its providers, then validate them"""
+    try:
+        providers = await asyncio.to_thread(store_uploaded_providers, job_id, filepath)
+        directory_agent.invalidate_stats()
+
+        await asyncio.to_thread(db.update_job, job_id, {
+            'status': 'PENDING',
+            'total_providers': len(providers)
+        })
+    except Exception as e:
+        await asyncio.to_thread(db.update_job, job_id, {
+            'status': 'FAILED',
+            'error_message': str(e),
+            'completed_at': datetime.now().isoformat()
+        })
+        return
+
+    await process_job(job_id, providers)
+
+
+async def process_job(job_id, providers):
+    """Background processing coroutine, run on the shared validation loop"""
     try:
-        db.update_job(job_id, {
+        await asyncio.to_thread(db.update_job, job_id, {
             'status': 'PROCESSING',
             'started_at': datetime.now().isoformat()
         })
         
         success_count = 0
         error_count = 0
+        processed = itertools.count(1)
+        pending_results = []
+        pending_flags = []
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_VALIDATIONS)
         
-        for i, provider in enumerate(providers):
-            try:
-                # Validate provider
-                result = validation_agent.validate_provider(provider)
-                
-                # Store result
-                db.insert_validation_result(result)
-                
-                # Store flags
-                for flag in result.get('flags', []):
-                    db.insert_flag(flag)
-                
+        def write_results(results, flags):
+            db.insert_validation_results_bulk(results)
+            if flags:
+                db.insert_flags_bulk(flags)
+                directory_agent.invalidate_stats()
+        
+        async def flush_pending():
+            # Hand the buffered rows to a worker thread so the loop keeps
+            # serving other jobs during the insert
+            results, flags = pending_results[:], pending_flags[:]
+            pending_results.clear()
+            pending_flags.clear()
+            await asyncio.to_thread(write_results, results, flags)
+        
+        async def validate(provider):
+            async with semaphore:
+                try:
+                    result = await validation_agent.validate_provider_async(provider, validation_executor)
+                    return provider, result, None
+                except Exception as e:
+                    return provider, None, e
+        
+        # Results are buffered here and bulk-inserted off the loop thread. Upload
+        # parsing and /api/validate also write, so SQLite (WAL + busy timeout)
+        # is what serializes concurrent writers.
+        for next_done in asyncio.as_completed([validate(p) for p in providers]):
+            provider, result, error = await next_done
+            if error is None:
+                # Buffer result and flags for the next bulk insert
+                result['job_id'] = job_id
+                pending_results.append(result)
+                pending_flags.extend(result.get('flags', []))
                 success_count += 1
-                
-            except Exception as e:
+            else:
                 error_count += 1
-                print(f"Error processing provider {provider.get('provider_id')}: {e}")
+                print(f"Error processing provider {provider.get('provider_id')}: {error}")
             
-            # Update progress
-            db.update_job(job_id, {
-                'processed_count': i + 1,
-                'success_count': success_count,
-                'error_count': error_count
-            })
+            # Update progress every PROGRESS_UPDATE_INTERVAL completions
+            done = next(processed)
+            if done % RESULT_FLUSH_INTERVAL == 0:
+                await flush_pending()
+            if done % PROGRESS_UPDATE_INTERVAL == 0:
+                await asyncio.to_thread(db.update_job, job_id, {
+                    'processed_count': done,
+                    'success_count': success_count,
+                    'error_count': error_count
+                })
+        
+        await flush_pending()
         
         # Mark as completed
-        db.update_job(job_id, {
+        await asyncio.to_thread(db.update_job, job_id, {
             'status': 'COMPLETED',
             'completed_at': datetime.now().isoformat(),
             'processed_count': len(providers),
@@ -310,7 +432,7 @@ def process_providers_background(job_id, providers):
         })
         
     except Exception as e:
-        db.update_job(job_id, {
+        await asyncio.to_thread(db.update_job, job_id, {
             'status': 'FAILED',
             'error_message': str(e),
             'completed_at': datetime.now().isoformat()
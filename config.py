@@ -40,10 +40,17 @@ class Config:
     # Processing Configuration
     MAX_CONCURRENT_VALIDATIONS = int(os.getenv('MAX_CONCURRENT_VALIDATIONS', '10'))
     CACHE_TTL_HOURS = int(os.getenv('CACHE_TTL_HOURS', '24'))
+    PHONE_CACHE_TTL_HOURS = int(os.getenv('PHONE_CACHE_TTL_HOURS', '6'))
+    # Name similarity uses a static model2vec model unless the heavier
+    # SentenceTransformer model is requested (e.g. for regression checks)
+    USE_HEAVY_EMBEDDINGS = os.getenv('USE_HEAVY_EMBEDDINGS', 'False').lower() == 'true'
+    EMBEDDING_CACHE_PATH = os.getenv(
+        'EMBEDDING_CACHE_PATH', os.path.expanduser('~/.cache/healthverify/emb.pkl')
+    )
     
     # File Upload Configuration
     MAX_UPLOAD_SIZE = int(os.getenv('MAX_UPLOAD_SIZE', '10485760'))  # 10MB
-    ALLOWED_EXTENSIONS = {'csv', 'xlsx', 'xls', 'pdf'}
+    ALLOWED_EXTENSIONS = frozenset({'csv', 'xlsx', 'xls', 'pdf'})
     
     # Confidence Scoring Weights
     NPI_WEIGHT = 0.40
@@ -51,3 +58,8 @@ class Config:
     PHONE_WEIGHT = 0.20
     WEB_WEIGHT = 0.10
 
+
+# Runtime-constant settings read on request paths, resolved once at import
+ALLOWED_EXTENSIONS = Config.ALLOWED_EXTENSIONS
+MAX_UPLOAD_SIZE = Config.MAX_UPLOAD_SIZE
+MAX_CONCURRENT_VALIDATIONS = Config.MAX_CONCURRENT_VALIDATIONS
@@ -11,12 +11,14 @@ class Provider:
     def __init__(self, provider_id: str, npi: str, first_name: str, last_name: str,
                  full_name: str, specialty: str, practice_address: str, city: str,
                  state: str, zip_code: str, phone: str, email: Optional[str] = None,
-                 website: Optional[str] = None):
+                 website: Optional[str] = None, job_id: Optional[str] = None,
+                 created_at: Optional[datetime] = None):
         self.provider_id = provider_id
         self.npi = npi
         self.first_name = first_name
         self.last_name = last_name
-        self.full_name = full_name
+        # Only keep full_name when it is more than "first last" (titles, single-field names)
+        self._full_name = full_name if full_name != self._join_name(first_name, last_name) else None
         self.specialty = specialty
         self.practice_address = practice_address
         self.city = city
@@ -25,8 +27,20 @@ class Provider:
         self.phone = phone
         self.email = email
         self.website = website
-        self.created_at = datetime.now()
-        self.updated_at = datetime.now()
+        self.job_id = job_id  # Upload job that last imported this provider
+        self.created_at = created_at or datetime.now()
+        self.updated_at = self.created_at
+    
+    @staticmethod
+    def _join_name(first_name: str, last_name: str) -> str:
+        return f"{first_name or ''} {last_name or ''}".strip()
+    
+    @property
+    def full_name(self) -> str:
+        """Display name, derived from first/last name unless given explicitly"""
+        if self._full_name is not None:
+            return self._full_name
+        return self._join_name(self.first_name, self.last_name)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert provider to dictionary"""
@@ -44,6 +58,7 @@ class Provider:
             'phone': self.phone,
             'email': self.email,
             'website': self.website,
+            'job_id': self.job_id,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
         }
@@ -64,7 +79,8 @@ class Provider:
             zip_code=data.get('zip_code', ''),
             phone=data.get('phone', ''),
             email=data.get('email'),
-            website=data.get('website')
+            website=data.get('website'),
+            job_id=data.get('job_id')
         )
 
 
@@ -74,8 +90,10 @@ class ValidationResult:
     def __init__(self, provider_id: str, validation_timestamp: datetime,
                  validation_duration_seconds: float, validations: Dict[str, Any],
                  overall_confidence: float, validation_status: str,
-                 flags: list, recommendations: list, sources_used: list):
+                 flags: list, recommendations: list, sources_used: list,
+                 job_id: Optional[str] = None):
         self.provider_id = provider_id
+        self.job_id = job_id
         self.validation_timestamp = validation_timestamp
         self.validation_duration_seconds = validation_duration_seconds
         self.validations = validations
@@ -96,7 +114,8 @@ class ValidationResult:
             'validation_status': self.validation_status,
             'flags': self.flags,
             'recommendations': self.recommendations,
-            'sources_used': self.sources_used
+            'sources_used': self.sources_used,
+            'job_id': self.job_id
         }
     
     @classmethod
@@ -104,14 +123,16 @@ class ValidationResult:
         """Create validation result from dictionary"""
         return cls(
             provider_id=data.get('provider_id', ''),
-            validation_timestamp=datetime.fromisoformat(data.get('validation_timestamp', datetime.now().isoformat())),
+            validation_timestamp=(datetime.fromisoformat(data['validation_timestamp'])
+                                  if data.get('validation_timestamp') else datetime.now()),
             validation_duration_seconds=data.get('validation_duration_seconds', 0.0),
             validations=data.get('validations', {}),
             overall_confidence=data.get('overall_confidence', 0.0),
             validation_status=data.get('validation_status', 'PENDING'),
             flags=data.get('flags', []),
             recommendations=data.get('recommendations', []),
-            sources_used=data.get('sources_used', [])
+            sources_used=data.get('sources_used', []),
+            job_id=data.get('job_id')
         )
 
 
@@ -119,14 +140,15 @@ class Flag:
     """Flag model for validation issues"""
     
     def __init__(self, provider_id: str, flag_type: str, severity: str,
-                 field: str, message: str, details: Optional[Dict[str, Any]] = None):
+                 field: str, message: str, details: Optional[Dict[str, Any]] = None,
+                 created_at: Optional[datetime] = None):
         self.provider_id = provider_id
         self.flag_type = flag_type  # CRITICAL, WARNING, INFO
         self.severity = severity  # high, medium, low
         self.field = field
         self.message = message
         self.details = details or {}
-        self.created_at = datetime.now()
+        self.created_at = created_at or datetime.now()
         self.resolved = False
         self.resolved_at = None
     
@@ -150,15 +172,16 @@ class ProcessingJob:
     
     def __init__(self, job_id: str, filename: str, total_providers: int,
                  status: str = 'PENDING', processed_count: int = 0,
-                 success_count: int = 0, error_count: int = 0):
+                 success_count: int = 0, error_count: int = 0,
+                 created_at: Optional[datetime] = None):
         self.job_id = job_id
         self.filename = filename
         self.total_providers = total_providers
-        self.status = status  # PENDING, PROCESSING, COMPLETED, FAILED
+        self.status = status  # PARSING, PENDING, PROCESSING, COMPLETED, FAILED
         self.processed_count = processed_count
         self.success_count = success_count
         self.error_count = error_count
-        self.created_at = datetime.now()
+        self.created_at = created_at or datetime.now()
         self.started_at = None
         self.completed_at = None
         self.error_message = None
@@ -0,0 +1,161 @@
+"""
+TTL cache for external API lookups (NPI / address / phone / Gemini extraction / web pages)
+
+Provider files often repeat the same NPI, address or phone number, so
+the results of those lookups are cached by a normalized key. Entries
+live in an in-process TTLCache backed by an ``api_cache`` table in the
+application database, so warm entries survive restarts. Namespaces can
+override the default TTL (e.g. phone line status changes faster than
+NPI registry data).
+"""
+import copy
+import functools
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+import orjson
+from cachetools import TLRUCache
+from config import Config
+
+
+# Results carrying these errors are transient and must not be cached
+TRANSIENT_ERROR_PREFIXES = ('API request failed', 'Unexpected error', 'Max retry attempts exceeded')
+
+# Per-namespace TTL overrides in seconds, registered by cached_lookup
+_NAMESPACE_TTLS: Dict[str, int] = {}
+
+
+class APICache:
+    """Two-level (memory + SQLite) TTL cache keyed by namespace and key"""
+
+    def __init__(self, db_path: str = None, maxsize: int = 10000, ttl_seconds: int = None):
+        self.db_path = db_path or Config.DATABASE_PATH
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.CACHE_TTL_HOURS * 3600
+        # Entries are (expires_at, value); both tiers share one wall-clock expiry
+        self._memory = TLRUCache(maxsize=maxsize, ttu=self._time_to_use, timer=time.time)
+        self._lock = threading.Lock()
+        self._init_table()
+
+    def ttl_for(self, namespace: str) -> int:
+        return _NAMESPACE_TTLS.get(namespace, self.ttl_seconds)
+
+    @staticmethod
+    def _time_to_use(key, entry, now) -> float:
+        return entry[0]
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    def _init_table(self):
+        conn = self._connect()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS api_cache (
+                    namespace TEXT,
+                    cache_key TEXT,
+                    value TEXT,
+                    expires_at REAL,
+                    PRIMARY KEY (namespace, cache_key)
+                )
+            ''')
+            # Expired rows are never read again
+            conn.execute('DELETE FROM api_cache WHERE expires_at < ?', (time.time(),))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        """Return a private copy of the cached value, or None on a miss"""
+        with self._lock:
+            entry = self._memory.get((namespace, key))
+        if entry is not None:
+            return copy.deepcopy(entry[1])
+
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                'SELECT value, expires_at FROM api_cache WHERE namespace = ? AND cache_key = ?',
+                (namespace, key)
+            ).fetchone()
+            if row and row[1] < time.time():
+                conn.execute('DELETE FROM api_cache WHERE namespace = ? AND cache_key = ?',
+                             (namespace, key))
+                conn.commit()
+                row = None
+        finally:
+            conn.close()
+        if not row:
+            return None
+
+        # Keep the row's remaining lifetime rather than restarting the TTL
+        value = orjson.loads(row[0])
+        with self._lock:
+            self._memory[(namespace, key)] = (row[1], value)
+        return copy.deepcopy(value)
+
+    def set(self, namespace: str, key: str, value: Dict[str, Any]):
+        """Store a copy of value in both tiers"""
+        stored = copy.deepcopy(value)
+        expires_at = time.time() + self.ttl_for(namespace)
+        with self._lock:
+            self._memory[(namespace, key)] = (expires_at, stored)
+        conn = self._connect()
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO api_cache (namespace, cache_key, value, expires_at) VALUES (?, ?, ?, ?)',
+                (namespace, key, orjson.dumps(stored).decode(), expires_at)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+
+_api_cache = None
+_api_cache_lock = threading.Lock()
+
+
+def get_api_cache() -> APICache:
+    """Lazily create the process-wide cache on first use"""
+    global _api_cache
+    if _api_cache is None:
+        with _api_cache_lock:
+            if _api_cache is None:
+                _api_cache = APICache()
+    return _api_cache
+
+
+def _is_cacheable(result: Any) -> bool:
+    if not isinstance(result, dict):
+        return False
+    error = result.get('error') or ''
+    return not error.startswith(TRANSIENT_ERROR_PREFIXES)
+
+
+def cached_lookup(namespace: str, key: Callable[..., str],
+                  cacheable: Callable[[Any], bool] = _is_cacheable,
+                  ttl_seconds: Optional[int] = None):
+    """
+    Cache a service method's result under ``key(*args, **kwargs)``
+
+    The key function receives the method arguments without ``self``.
+    Results rejected by ``cacheable`` (by default, failed/transient
+    requests) are returned but not cached. ``ttl_seconds`` overrides
+    the cache-wide TTL for this namespace.
+    """
+    if ttl_seconds is not None:
+        _NAMESPACE_TTLS[namespace] = ttl_seconds
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            cache_key = key(*args, **kwargs)
+            cache = get_api_cache()
+            hit = cache.get(namespace, cache_key)
+            if hit is not None:
+                return hit
+            result = func(self, *args, **kwargs)
+            if cacheable(result):
+                cache.set(namespace, cache_key, result)
+            return result
+        return wrapper
+    return decorator
@@ -2,14 +2,32 @@
 Gemini AI Service for document extraction and OCR
 """
 import google.generativeai as genai
-import sys
-import os
+import re
+import hashlib
+import mimetypes
+import orjson
 from typing import Dict, Any, Optional
 import base64
 import io
-from PIL import Image
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import Config
+from services.cache import cached_lookup
+
+
+_WHITESPACE_RE = re.compile(r'\s+')
+# JSON object inside a markdown code fence, else the outermost {...} in the reply
+_JSON_FENCE_RE = re.compile(r'```(?:json)?\s*(\{.*\})\s*```', re.S)
+_JSON_OBJECT_RE = re.compile(r'\{.*\}', re.S)
+
+
+def _document_key(document_text: str) -> str:
+    # Re-uploads of the same document differ at most in whitespace (OCR/PDF extraction)
+    normalized = _WHITESPACE_RE.sub(' ', document_text or '').strip()
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+def _is_successful(result: Any) -> bool:
+    # Parse failures and config errors may succeed on the next call
+    return isinstance(result, dict) and bool(result.get('success'))
 
 
 class GeminiService:
@@ -41,10 +59,14 @@ class GeminiService:
             }
         
         try:
-            img = Image.open(image_path)
+            # Send the encoded file as-is; decoding it with PIL first only
+            # for the SDK to re-encode it wastes a full pixel buffer
+            mime_type = mimetypes.guess_type(image_path)[0] or 'image/jpeg'
+            with open(image_path, 'rb') as f:
+                image_data = f.read()
             response = self.model.generate_content([
                 "Extract all text from this image. Return only the text content.",
-                img
+                {'mime_type': mime_type, 'data': image_data}
             ])
             
             return {
@@ -59,6 +81,7 @@ class GeminiService:
                 'text': None
             }
     
+    @cached_lookup('gemini_extract', key=_document_key, cacheable=_is_successful)
     def extract_provider_info_from_document(self, document_text: str) -> Dict[str, Any]:
         """
         Extract provider information from document text using Gemini
@@ -103,23 +126,21 @@ class GeminiService:
             response = model.generate_content(prompt)
             
             # Try to parse JSON from response
-            import json
             try:
-                # Extract JSON from response (might have markdown code blocks)
+                # Extract JSON from response (might have markdown code blocks
+                # or stray text around the object)
                 text = response.text.strip()
-                if text.startswith('```'):
-                    text = text.split('```')[1]
-                    if text.startswith('json'):
-                        text = text[4:]
-                text = text.strip()
+                match = _JSON_FENCE_RE.search(text) or _JSON_OBJECT_RE.search(text)
+                if match:
+                    text = match.group(match.lastindex or 0)
                 
-                extracted_data = json.loads(text)
+                extracted_data = orjson.loads(text)
                 return {
                     'success': True,
                     'extracted_data': extracted_data,
                     'error': None
                 }
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 return {
                     'success': False,
                     'error': 'Failed to parse JSON from Gemini response',
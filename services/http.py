@@ -0,0 +1,66 @@
+"""
+Shared HTTP sessions for outbound API calls
+
+All service clients go through connection-pooled requests.Sessions so
+keep-alive TCP/TLS connections are reused across providers instead of
+being re-established by every bare requests.get().
+"""
+import threading
+from typing import Dict
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import Config
+
+
+# Transient statuses worth retrying (rate limiting and gateway/server hiccups)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_sessions: Dict[bool, requests.Session] = {}
+_session_lock = threading.Lock()
+
+
+def _build_session(retry: bool) -> requests.Session:
+    if retry:
+        # Exponential backoff with jitter, honouring Retry-After on 429/503.
+        # Exhausted status retries return the last response so callers'
+        # raise_for_status() reports it as an ordinary request failure.
+        max_retries = Retry(
+            total=max(Config.API_RETRY_ATTEMPTS - 1, 0),
+            backoff_factor=Config.API_RETRY_DELAY,
+            backoff_jitter=0.5,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=('GET',),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+    else:
+        max_retries = 0
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=Config.MAX_CONCURRENT_VALIDATIONS,
+        pool_maxsize=Config.MAX_CONCURRENT_VALIDATIONS * 2,
+        max_retries=max_retries
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session(retry: bool = False) -> requests.Session:
+    """
+    Return a process-wide session, creating it on first use
+
+    ``retry=True`` returns the session the API clients (NPI, phone,
+    geocoding) use: its adapter retries GETs with backoff per
+    Config.API_RETRY_*. The default session never retries, for calls
+    where a retry would only add latency (website probes/scrapes, OCR
+    uploads).
+    """
+    session = _sessions.get(retry)
+    if session is None:
+        with _session_lock:
+            session = _sessions.get(retry)
+            if session is None:
+                session = _sessions[retry] = _build_session(retry)
+    return session
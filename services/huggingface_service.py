@@ -1,22 +1,175 @@
 """
 Hugging Face Service for NLP and text similarity
 """
-from sentence_transformers import SentenceTransformer
-from typing import Dict, Any, List
+import atexit
+import os
+import pickle
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Tuple
 import numpy as np
-from difflib import SequenceMatcher
+from rapidfuzz import fuzz
+from config import Config
+
+
+# Entity patterns for extract_entities, compiled once at import
+_PHONE_RE = re.compile(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_ADDRESS_RE = re.compile(r'\d+\s+[\w\s]+(?:Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln|Boulevard|Blvd)')
 
 
 class HuggingFaceService:
     """Service for Hugging Face NLP models"""
     
-    def __init__(self):
+    # Maximum number of embeddings kept in the LRU cache
+    EMBEDDING_CACHE_SIZE = 4096
+    
+    STATIC_MODEL_NAME = 'minishlab/potion-base-8M'
+    HEAVY_MODEL_NAME = 'all-MiniLM-L6-v2'
+    model_name = HEAVY_MODEL_NAME if Config.USE_HEAVY_EMBEDDINGS else STATIC_MODEL_NAME
+    
+    # The model is loaded on first use and shared by every instance, so
+    # callers that only need extract_entities never pay for it
+    _model = None
+    _model_resolved = False
+    _model_lock = threading.Lock()
+    
+    # Provider names repeat across files, so embeddings are cached by
+    # normalized text and persisted between runs
+    _emb_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+    _emb_lock = threading.Lock()
+    
+    @classmethod
+    def _get_model(cls):
+        """Load the similarity model once per process; None if unavailable"""
+        if not cls._model_resolved:
+            with cls._model_lock:
+                if not cls._model_resolved:
+                    cls._model = cls._load_model()
+                    if cls._model:
+                        cls._load_embedding_cache()
+                        atexit.register(cls._save_embedding_cache)
+                    cls._model_resolved = True
+        return cls._model
+    
+    @classmethod
+    def _load_model(cls):
         try:
-            # Load sentence transformer model for semantic similarity
-            self.similarity_model = SentenceTransformer('all-MiniLM-L6-v2')
+            if Config.USE_HEAVY_EMBEDDINGS:
+                # Load sentence transformer model for semantic similarity;
+                # one torch thread keeps it from contending with request workers
+                import torch
+                from sentence_transformers import SentenceTransformer
+                torch.set_num_threads(1)
+                return SentenceTransformer(cls.model_name)
+            # Static embeddings: token lookup + mean pool in NumPy, no torch
+            from model2vec import StaticModel
+            return StaticModel.from_pretrained(cls.model_name)
         except Exception as e:
             print(f"Warning: Could not load Hugging Face model: {e}")
-            self.similarity_model = None
+            return None
+    
+    @property
+    def similarity_model(self):
+        return self._get_model()
+    
+    @classmethod
+    def _load_embedding_cache(cls):
+        """Restore embeddings pickled by a previous run, if any"""
+        try:
+            with open(Config.EMBEDDING_CACHE_PATH, 'rb') as f:
+                saved = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return
+        # Embeddings from a different model are not comparable
+        if not isinstance(saved, dict) or saved.get('model') != cls.model_name:
+            return
+        cached = saved.get('embeddings')
+        if isinstance(cached, OrderedDict):
+            while len(cached) > cls.EMBEDDING_CACHE_SIZE:
+                cached.popitem(last=False)
+            with cls._emb_lock:
+                cls._emb_cache = cached
+    
+    @classmethod
+    def _save_embedding_cache(cls):
+        """Pickle the embedding cache so the next run starts warm"""
+        with cls._emb_lock:
+            snapshot = OrderedDict(cls._emb_cache)
+        if not snapshot:
+            return
+        try:
+            os.makedirs(os.path.dirname(Config.EMBEDDING_CACHE_PATH), exist_ok=True)
+            tmp_path = Config.EMBEDDING_CACHE_PATH + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(
+                    {'model': cls.model_name, 'embeddings': snapshot},
+                    f, protocol=pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(tmp_path, Config.EMBEDDING_CACHE_PATH)
+        except OSError as e:
+            print(f"Warning: Could not save embedding cache: {e}")
+    
+    def _embed(self, text: str) -> np.ndarray:
+        """
+        Return the unit-length embedding for text, encoding only on a cache miss
+        
+        Args:
+            text: Input text
+            
+        Returns:
+            Normalized embedding vector
+        """
+        return self._embed_batch([text])[0]
+    
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed many texts, running a single batched encode() for the cache misses
+        
+        Args:
+            texts: Input texts
+            
+        Returns:
+            Matrix of normalized embeddings, one row per input text
+        """
+        keys = [text.strip().lower() for text in texts]
+        found: Dict[str, np.ndarray] = {}
+        with self._emb_lock:
+            for key in keys:
+                embedding = self._emb_cache.get(key)
+                if embedding is not None:
+                    self._emb_cache.move_to_end(key)
+                    found[key] = embedding
+        
+        misses = list(dict.fromkeys(key for key in keys if key not in found))
+        if misses:
+            encoded = self._encode(misses)
+            found.update(zip(misses, encoded))
+            with self._emb_lock:
+                for key, embedding in zip(misses, encoded):
+                    self._emb_cache[key] = embedding
+                    self._emb_cache.move_to_end(key)
+                while len(self._emb_cache) > self.EMBEDDING_CACHE_SIZE:
+                    self._emb_cache.popitem(last=False)
+        
+        return np.stack([found[key] for key in keys])
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Run the loaded model on texts and return unit-length float32 rows"""
+        if Config.USE_HEAVY_EMBEDDINGS:
+            # encode() sorts by length internally, so each batch pads minimally
+            embeddings = self.similarity_model.encode(
+                texts, batch_size=64, convert_to_numpy=True,
+                normalize_embeddings=True, show_progress_bar=False
+            )
+            return np.asarray(embeddings, dtype=np.float32)
+        
+        # encode() returns a fresh array, so it is normalized in place
+        embeddings = np.asarray(self.similarity_model.encode(texts), dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings /= np.maximum(norms, 1e-12)
+        return embeddings
     
     def calculate_semantic_similarity(self, text1: str, text2: str) -> float:
         """
@@ -31,17 +184,15 @@ class HuggingFaceService:
         """
         if not self.similarity_model:
             # Fallback to basic string similarity
-            return SequenceMatcher(None, text1.lower(), text2.lower()).ratio()
+            return fuzz.ratio(text1.lower(), text2.lower()) / 100.0
         
         try:
-            embeddings = self.similarity_model.encode([text1, text2])
-            similarity = np.dot(embeddings[0], embeddings[1]) / (
-                np.linalg.norm(embeddings[0]) * np.linalg.norm(embeddings[1])
-            )
-            return float(similarity)
+            # Unit-length embeddings make cosine similarity a plain dot product
+            embeddings = self._embed_batch([text1, text2])
+            return float(np.dot(embeddings[0], embeddings[1]))
         except Exception as e:
             # Fallback to basic string similarity
-            return SequenceMatcher(None, text1.lower(), text2.lower()).ratio()
+            return fuzz.ratio(text1.lower(), text2.lower()) / 100.0
     
     def fuzzy_match_names(self, name1: str, name2: str) -> Dict[str, Any]:
         """
@@ -54,21 +205,55 @@ class HuggingFaceService:
         Returns:
             Dictionary with match results
         """
+        return self.fuzzy_match_names_batch([(name1, name2)])[0]
+    
+    def fuzzy_match_names_batch(self, pairs: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Perform fuzzy matching on many provider name pairs at once
+        
+        Every distinct name is embedded once, so a batch costs one encode()
+        pass instead of one per pair.
+        
+        Args:
+            pairs: (name1, name2) tuples
+            
+        Returns:
+            List of match result dictionaries, in the order of pairs
+        """
+        if not pairs:
+            return []
+        
         # Basic string similarity
-        basic_similarity = SequenceMatcher(None, name1.lower(), name2.lower()).ratio()
+        basic = [fuzz.ratio(n1.lower(), n2.lower()) / 100.0 for n1, n2 in pairs]
         
         # Semantic similarity if model available
-        semantic_similarity = self.calculate_semantic_similarity(name1, name2)
-        
-        # Combined score
-        combined_score = (basic_similarity * 0.6 + semantic_similarity * 0.4)
+        semantic = None
+        if self.similarity_model:
+            try:
+                unique = list(dict.fromkeys(name for pair in pairs for name in pair))
+                embs = self._embed_batch(unique)
+                index = {name: i for i, name in enumerate(unique)}
+                left = embs[[index[n1] for n1, _ in pairs]]
+                right = embs[[index[n2] for _, n2 in pairs]]
+                # Row-wise dot of unit vectors: only the requested pairs, not embs @ embs.T
+                semantic = np.einsum('ij,ij->i', left, right).tolist()
+            except Exception:
+                semantic = None
+        if semantic is None:
+            # Fallback to basic string similarity
+            semantic = basic
         
-        return {
-            'basic_similarity': basic_similarity,
-            'semantic_similarity': semantic_similarity,
-            'combined_score': combined_score,
-            'is_match': combined_score > 0.8
-        }
+        results = []
+        for basic_similarity, semantic_similarity in zip(basic, semantic):
+            # Combined score
+            combined_score = (basic_similarity * 0.6 + semantic_similarity * 0.4)
+            results.append({
+                'basic_similarity': basic_similarity,
+                'semantic_similarity': semantic_similarity,
+                'combined_score': combined_score,
+                'is_match': combined_score > 0.8
+            })
+        return results
     
     def extract_entities(self, text: str) -> Dict[str, Any]:
         """
@@ -82,19 +267,9 @@ class HuggingFaceService:
         """
         # This is a simplified version
         # In production, you would use a proper NER model
-        import re
-        
-        # Extract phone numbers
-        phone_pattern = re.compile(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
-        phones = phone_pattern.findall(text)
-        
-        # Extract emails
-        email_pattern = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
-        emails = email_pattern.findall(text)
-        
-        # Extract addresses (basic pattern)
-        address_pattern = re.compile(r'\d+\s+[\w\s]+(?:Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln|Boulevard|Blvd)')
-        addresses = address_pattern.findall(text)
+        phones = _PHONE_RE.findall(text)
+        emails = _EMAIL_RE.findall(text)
+        addresses = _ADDRESS_RE.findall(text)
         
         return {
             'phones': phones,
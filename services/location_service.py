@@ -1,14 +1,43 @@
 """
 Location/Geocoding Service using TomTom and LocationIQ APIs
 """
+import orjson
 import requests
-import time
-import sys
-import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional
-from difflib import SequenceMatcher
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rapidfuzz import fuzz
 from config import Config
+from services.http import get_session
+from services.cache import cached_lookup
+
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _address_key(address, city, state, zip_code) -> str:
+    # Geocoding and match scoring are case/whitespace-insensitive; the street
+    # line only reaches the geocoder, so runs of whitespace inside it collapse
+    street = _WHITESPACE_RE.sub(' ', str(address or '').strip().lower())
+    return '|'.join([street] + [str(part or '').strip().lower() for part in (city, state, zip_code)])
+
+
+_geocode_executor = None
+_geocode_executor_lock = threading.Lock()
+
+
+def _get_geocode_executor() -> ThreadPoolExecutor:
+    """Pool for running both geocoders of one address side by side"""
+    global _geocode_executor
+    if _geocode_executor is None:
+        with _geocode_executor_lock:
+            if _geocode_executor is None:
+                _geocode_executor = ThreadPoolExecutor(
+                    max_workers=2 * Config.MAX_CONCURRENT_VALIDATIONS,
+                    thread_name_prefix='geocode'
+                )
+    return _geocode_executor
 
 
 class LocationService:
@@ -18,9 +47,8 @@ class LocationService:
         self.tomtom_key = Config.TOMTOM_API_KEY
         self.locationiq_key = Config.LOCATIONIQ_API_KEY
         self.timeout = Config.API_TIMEOUT
-        self.retry_attempts = Config.API_RETRY_ATTEMPTS
-        self.retry_delay = Config.API_RETRY_DELAY
     
+    @cached_lookup('address', key=_address_key)
     def validate_address(self, address: str, city: str, state: str, zip_code: str) -> Dict[str, Any]:
         """
         Validate address using geocoding APIs
@@ -36,12 +64,16 @@ class LocationService:
         """
         full_address = f"{address}, {city}, {state} {zip_code}"
         
-        # Try TomTom first
-        result = self._geocode_tomtom(full_address, city, state, zip_code)
+        # Both geocoders run concurrently so a weak TomTom answer does not
+        # cost a second serial round-trip to LocationIQ
+        executor = _get_geocode_executor()
+        tomtom_future = executor.submit(self._geocode_tomtom, full_address, city, state, zip_code)
+        locationiq_future = executor.submit(self._geocode_locationiq, full_address, city, state, zip_code)
         
-        # If TomTom fails, try LocationIQ as backup
+        # TomTom is preferred; LocationIQ is the backup when TomTom fails
+        result = tomtom_future.result()
         if not result.get('valid') or result.get('confidence', 0) < 60:
-            locationiq_result = self._geocode_locationiq(full_address, city, state, zip_code)
+            locationiq_result = locationiq_future.result()
             if locationiq_result.get('confidence', 0) > result.get('confidence', 0):
                 result = locationiq_result
         
@@ -55,85 +87,73 @@ class LocationService:
             'limit': 1
         }
         
-        for attempt in range(self.retry_attempts):
-            try:
-                response = requests.get(url, params=params, timeout=self.timeout)
-                response.raise_for_status()
-                data = response.json()
-                
-                if not data.get('results'):
-                    return {
-                        'valid': False,
-                        'confidence': 30,
-                        'source': 'TomTom Geocoding API',
-                        'error': 'No results found',
-                        'verified_data': None
-                    }
-                
-                result = data['results'][0]
-                position = result.get('position', {})
-                address_data = result.get('address', {})
-                
-                # Extract formatted address
-                formatted_address = address_data.get('freeformAddress', full_address)
-                returned_city = address_data.get('municipality', '')
-                returned_state = address_data.get('countrySubdivision', '')
-                returned_zip = address_data.get('postalCode', '')
-                
-                # Calculate match quality
-                match_quality = self._calculate_address_match(
-                    city, state, zip_code,
-                    returned_city, returned_state, returned_zip
-                )
-                
-                confidence = match_quality['confidence']
-                
-                verified_data = {
-                    'formatted_address': formatted_address,
-                    'latitude': position.get('lat'),
-                    'longitude': position.get('lon'),
-                    'city': returned_city,
-                    'state': returned_state,
-                    'zip_code': returned_zip,
-                    'match_quality': match_quality['quality']
-                }
-                
-                return {
-                    'valid': True,
-                    'confidence': confidence,
-                    'source': 'TomTom Geocoding API',
-                    'verified_data': verified_data,
-                    'error': None
-                }
-                
-            except requests.exceptions.RequestException as e:
-                if attempt < self.retry_attempts - 1:
-                    time.sleep(self.retry_delay * (attempt + 1))
-                    continue
-                else:
-                    return {
-                        'valid': False,
-                        'confidence': 20,
-                        'source': 'TomTom Geocoding API',
-                        'error': f'API request failed: {str(e)}',
-                        'verified_data': None
-                    }
-            except Exception as e:
+        try:
+            response = get_session(retry=True).get(url, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+            
+            if not data.get('results'):
                 return {
                     'valid': False,
-                    'confidence': 20,
+                    'confidence': 30,
                     'source': 'TomTom Geocoding API',
-                    'error': f'Unexpected error: {str(e)}',
+                    'error': 'No results found',
                     'verified_data': None
                 }
-        
-        return {
-            'valid': False,
-            'confidence': 20,
-            'source': 'TomTom Geocoding API',
-            'error': 'Max retry attempts exceeded',
-            'verified_data': None
-        }
+            
+            result = data['results'][0]
+            position = result.get('position', {})
+            address_data = result.get('address', {})
+            
+            # Extract formatted address
+            formatted_address = address_data.get('freeformAddress', full_address)
+            returned_city = address_data.get('municipality', '')
+            returned_state = address_data.get('countrySubdivision', '')
+            returned_zip = address_data.get('postalCode', '')
+            
+            # Calculate match quality
+            match_quality = self._calculate_address_match(
+                city, state, zip_code,
+                returned_city, returned_state, returned_zip
+            )
+            
+            confidence = match_quality['confidence']
+            
+            verified_data = {
+                'formatted_address': formatted_address,
+                'latitude': position.get('lat'),
+                'longitude': position.get('lon'),
+                'city': returned_city,
+                'state': returned_state,
+                'zip_code': returned_zip,
+                'match_quality': match_quality['quality']
+            }
+            
+            return {
+                'valid': True,
+                'confidence': confidence,
+                'source': 'TomTom Geocoding API',
+                'verified_data': verified_data,
+                'error': None
+            }
+            
+        except requests.exceptions.RequestException as e:
+            # Retries with backoff already happened inside the session adapter
+            return {
+                'valid': False,
+                'confidence': 20,
+                'source': 'TomTom Geocoding API',
+                'error': f'API request failed: {str(e)}',
+                'verified_data': None
+            }
+        except Exception as e:
+            return {
+                'valid': False,
+                'confidence': 20,
+                'source': 'TomTom Geocoding API',
+                'error': f'Unexpected error: {str(e)}',
+                'verified_data': None
+            }
     
     def _geocode_locationiq(self, full_address: str, city: str, state: str, zip_code: str) -> Dict[str, Any]:
         """Geocode using LocationIQ API (backup)"""
@@ -145,82 +165,70 @@ class LocationService:
             'limit': 1
         }
         
-        for attempt in range(self.retry_attempts):
-            try:
-                response = requests.get(url, params=params, timeout=self.timeout)
-                response.raise_for_status()
-                data = response.json()
-                
-                if not data or (isinstance(data, list) and len(data) == 0):
-                    return {
-                        'valid': False,
-                        'confidence': 30,
-                        'source': 'LocationIQ API',
-                        'error': 'No results found',
-                        'verified_data': None
-                    }
-                
-                result = data[0] if isinstance(data, list) else data
-                
-                formatted_address = result.get('display_name', full_address)
-                returned_city = result.get('address', {}).get('city', '') or result.get('address', {}).get('town', '')
-                returned_state = result.get('address', {}).get('state', '')
-                returned_zip = result.get('address', {}).get('postcode', '')
-                
-                # Calculate match quality
-                match_quality = self._calculate_address_match(
-                    city, state, zip_code,
-                    returned_city, returned_state, returned_zip
-                )
-                
-                confidence = match_quality['confidence']
-                
-                verified_data = {
-                    'formatted_address': formatted_address,
-                    'latitude': float(result.get('lat', 0)),
-                    'longitude': float(result.get('lon', 0)),
-                    'city': returned_city,
-                    'state': returned_state,
-                    'zip_code': returned_zip,
-                    'match_quality': match_quality['quality']
-                }
-                
-                return {
-                    'valid': True,
-                    'confidence': confidence,
-                    'source': 'LocationIQ API',
-                    'verified_data': verified_data,
-                    'error': None
-                }
-                
-            except requests.exceptions.RequestException as e:
-                if attempt < self.retry_attempts - 1:
-                    time.sleep(self.retry_delay * (attempt + 1))
-                    continue
-                else:
-                    return {
-                        'valid': False,
-                        'confidence': 20,
-                        'source': 'LocationIQ API',
-                        'error': f'API request failed: {str(e)}',
-                        'verified_data': None
-                    }
-            except Exception as e:
+        try:
+            response = get_session(retry=True).get(url, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+            
+            if not data or (isinstance(data, list) and len(data) == 0):
                 return {
                     'valid': False,
-                    'confidence': 20,
+                    'confidence': 30,
                     'source': 'LocationIQ API',
-                    'error': f'Unexpected error: {str(e)}',
+                    'error': 'No results found',
                     'verified_data': None
                 }
-        
-        return {
-            'valid': False,
-            'confidence': 20,
-            'source': 'LocationIQ API',
-            'error': 'Max retry attempts exceeded',
-            'verified_data': None
-        }
+            
+            result = data[0] if isinstance(data, list) else data
+            
+            formatted_address = result.get('display_name', full_address)
+            returned_city = result.get('address', {}).get('city', '') or result.get('address', {}).get('town', '')
+            returned_state = result.get('address', {}).get('state', '')
+            returned_zip = result.get('address', {}).get('postcode', '')
+            
+            # Calculate match quality
+            match_quality = self._calculate_address_match(
+                city, state, zip_code,
+                returned_city, returned_state, returned_zip
+            )
+            
+            confidence = match_quality['confidence']
+            
+            verified_data = {
+                'formatted_address': formatted_address,
+                'latitude': float(result.get('lat', 0)),
+                'longitude': float(result.get('lon', 0)),
+                'city': returned_city,
+                'state': returned_state,
+                'zip_code': returned_zip,
+                'match_quality': match_quality['quality']
+            }
+            
+            return {
+                'valid': True,
+                'confidence': confidence,
+                'source': 'LocationIQ API',
+                'verified_data': verified_data,
+                'error': None
+            }
+            
+        except requests.exceptions.RequestException as e:
+            # Retries with backoff already happened inside the session adapter
+            return {
+                'valid': False,
+                'confidence': 20,
+                'source': 'LocationIQ API',
+                'error': f'API request failed: {str(e)}',
+                'verified_data': None
+            }
+        except Exception as e:
+            return {
+                'valid': False,
+                'confidence': 20,
+                'source': 'LocationIQ API',
+                'error': f'Unexpected error: {str(e)}',
+                'verified_data': None
+            }
     
     def _calculate_address_match(self, input_city: str, input_state: str, input_zip: str,
                                  returned_city: str, returned_state: str, returned_zip: str) -> Dict[str, Any]:
@@ -239,19 +247,23 @@ class LocationService:
             input_zip == returned_zip):
             return {'quality': 'exact', 'confidence': 95}
         
+        # Every close/partial match requires the state to agree, so a state
+        # mismatch is 'none' without scoring the city at all
+        if input_state != returned_state:
+            return {'quality': 'none', 'confidence': 30}
+        
         # Close match (city and state match, zip might differ)
-        city_match = SequenceMatcher(None, input_city, returned_city).ratio()
-        state_match = input_state == returned_state
+        city_match = fuzz.ratio(input_city, returned_city) / 100.0
         zip_match = input_zip == returned_zip
         
-        if city_match > 0.8 and state_match:
+        if city_match > 0.8:
             if zip_match:
                 return {'quality': 'close', 'confidence': 85}
             else:
                 return {'quality': 'partial', 'confidence': 60}
         
         # Partial match
-        if city_match > 0.6 and state_match:
+        if city_match > 0.6:
             return {'quality': 'partial', 'confidence': 60}
         
         # No match
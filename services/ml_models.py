@@ -2,11 +2,10 @@
 ML Models for confidence scoring and anomaly detection
 """
 import numpy as np
-import sys
-import os
+from collections import Counter
 from typing import Dict, Any, List
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import Config
+from services.scoring_kernels import combine_scores, batch_combine
 
 
 class MLModels:
@@ -17,6 +16,11 @@ class MLModels:
         self.address_weight = Config.ADDRESS_WEIGHT
         self.phone_weight = Config.PHONE_WEIGHT
         self.web_weight = Config.WEB_WEIGHT
+        # Source weights in score-matrix column order (npi, address, phone, website)
+        self._weights = np.array(
+            [self.npi_weight, self.address_weight, self.phone_weight, self.web_weight],
+            dtype=np.float64
+        )
     
     def calculate_overall_confidence(self, validations: Dict[str, Any]) -> float:
         """
@@ -34,11 +38,9 @@ class MLModels:
         web_conf = validations.get('website', {}).get('confidence', 0)
         
         # Weighted average
-        overall = (
-            npi_conf * self.npi_weight +
-            address_conf * self.address_weight +
-            phone_conf * self.phone_weight +
-            web_conf * self.web_weight
+        overall = combine_scores(
+            float(npi_conf), float(address_conf), float(phone_conf), float(web_conf),
+            self.npi_weight, self.address_weight, self.phone_weight, self.web_weight
         )
         
         # Apply penalties for inconsistencies
@@ -47,6 +49,26 @@ class MLModels:
         
         return round(overall, 2)
     
+    def calculate_overall_confidence_batch(self, validations_list: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Vectorized calculate_overall_confidence for many providers at once
+        
+        Args:
+            validations_list: One validations dictionary per provider
+            
+        Returns:
+            Array of overall confidence scores (0-100), in input order
+        """
+        sources = ('npi', 'address', 'phone', 'website')
+        scores = np.array(
+            [[v.get(source, {}).get('confidence', 0) for source in sources] for v in validations_list],
+            dtype=np.float64
+        ).reshape(-1, len(sources))
+        penalties = self._calculate_penalties_batch(validations_list)
+        
+        overall = np.maximum(0, batch_combine(scores, self._weights) - penalties)
+        return np.round(overall, 2)
+    
     def _calculate_penalties(self, validations: Dict[str, Any]) -> float:
         """Calculate penalty points for inconsistencies"""
         penalty = 0.0
@@ -72,6 +94,22 @@ class MLModels:
         
         return penalty
     
+    def _calculate_penalties_batch(self, validations_list: List[Dict[str, Any]]) -> np.ndarray:
+        """Vectorized _calculate_penalties over many providers' validations"""
+        flags = np.array(
+            [(bool(v.get('npi', {}).get('valid', False)),
+              bool(v.get('address', {}).get('valid', False)),
+              bool(v.get('phone', {}).get('valid', False)),
+              bool(v.get('npi', {}).get('matches_input', True))) for v in validations_list],
+            dtype=np.bool_
+        ).reshape(-1, 4)
+        npi_valid, address_valid, phone_valid, npi_matches = flags.T
+        
+        # Same rules as _calculate_penalties, as masks instead of branches
+        conflict = ~npi_valid & (address_valid | phone_valid)
+        single_source = flags[:, :3].sum(axis=1) == 1
+        return conflict * 10.0 + single_source * 5.0 + ~npi_matches * 15.0
+    
     def detect_anomalies(self, validation_result: Dict[str, Any]) -> List[str]:
         """
         Detect anomalies in validation results
@@ -120,16 +158,18 @@ class MLModels:
         Returns:
             List of recommendations
         """
-        recommendations = []
-        validations = validation_result.get('validations', {})
         overall_confidence = validation_result.get('overall_confidence', 0)
         flags = validation_result.get('flags', [])
         
         # High confidence - no action needed
         if overall_confidence >= 80 and not flags:
-            recommendations.append("Provider successfully validated across all sources")
-            recommendations.append("High confidence score - no manual review needed")
-            return recommendations
+            return [
+                "Provider successfully validated across all sources",
+                "High confidence score - no manual review needed"
+            ]
+        
+        recommendations = []
+        validations = validation_result.get('validations', {})
         
         # Check individual validations
         npi_valid = validations.get('npi', {}).get('valid', False)
@@ -145,13 +185,14 @@ class MLModels:
             recommendations.append("WARNING: Phone number validation failed - verify phone number")
         
         # Check for flags
-        critical_flags = [f for f in flags if f.get('flag_type') == 'CRITICAL']
+        flag_counts = Counter(f.get('flag_type') for f in flags)
+        critical_flags = flag_counts['CRITICAL']
         if critical_flags:
-            recommendations.append(f"CRITICAL: {len(critical_flags)} critical issue(s) require immediate attention")
+            recommendations.append(f"CRITICAL: {critical_flags} critical issue(s) require immediate attention")
         
-        warning_flags = [f for f in flags if f.get('flag_type') == 'WARNING']
+        warning_flags = flag_counts['WARNING']
         if warning_flags:
-            recommendations.append(f"WARNING: {len(warning_flags)} warning(s) need review")
+            recommendations.append(f"WARNING: {warning_flags} warning(s) need review")
         
         if not recommendations:
             recommendations.append("Provider data validated with minor issues")
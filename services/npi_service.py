@@ -1,13 +1,29 @@
 """
 NPI Registry API Service for provider verification
 """
+import copy
+import orjson
 import requests
-import time
-import sys
-import os
-from typing import Dict, Any, Optional
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from rapidfuzz import fuzz
 from config import Config
+from services.http import get_session
+from services.cache import cached_lookup
+from services.phone_service import digits_only
+
+
+def _npi_check_digit_ok(npi: str) -> bool:
+    """Luhn check over the 80840 health-industry prefix plus the first 9 digits"""
+    total = 24  # Luhn contribution of the constant 80840 prefix
+    for i, ch in enumerate(npi[8::-1]):
+        digit = ord(ch) - 48
+        if i % 2 == 0:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        total += digit
+    return (10 - total % 10) % 10 == ord(npi[9]) - 48
 
 
 class NPIService:
@@ -16,8 +32,6 @@ class NPIService:
     def __init__(self):
         self.base_url = Config.NPI_REGISTRY_API_URL
         self.timeout = Config.API_TIMEOUT
-        self.retry_attempts = Config.API_RETRY_ATTEMPTS
-        self.retry_delay = Config.API_RETRY_DELAY
     
     def validate_npi(self, npi: str) -> Dict[str, Any]:
         """
@@ -29,111 +43,142 @@ class NPIService:
         Returns:
             Dictionary with validation results
         """
-        if not npi or len(npi) != 10 or not npi.isdigit():
-            return {
-                'valid': False,
-                'confidence': 0,
-                'source': 'NPI Registry (CMS)',
-                'error': 'Invalid NPI format',
-                'verified_data': None,
-                'matches_input': False
-            }
+        if not npi or len(npi) != 10 or not (npi.isascii() and npi.isdigit()):
+            return self._invalid_npi('Invalid NPI format')
         
+        # Every issued NPI carries a Luhn check digit, so typos and made-up
+        # numbers are rejected without a registry round-trip
+        if not _npi_check_digit_ok(npi):
+            return self._invalid_npi('Invalid NPI check digit')
+        
+        return self._lookup_npi(npi)
+    
+    @staticmethod
+    def _invalid_npi(error: str) -> Dict[str, Any]:
+        return {
+            'valid': False,
+            'confidence': 0,
+            'source': 'NPI Registry (CMS)',
+            'error': error,
+            'verified_data': None,
+            'matches_input': False
+        }
+    
+    @cached_lookup('npi', key=lambda npi: str(npi))
+    def _lookup_npi(self, npi: str) -> Dict[str, Any]:
+        """Query the NPI Registry for a well-formed NPI"""
         url = f"{self.base_url}?number={npi}&version=2.1"
         
-        for attempt in range(self.retry_attempts):
-            try:
-                response = requests.get(url, timeout=self.timeout)
-                response.raise_for_status()
-                data = response.json()
-                
-                if data.get('result_count', 0) == 0:
-                    return {
-                        'valid': False,
-                        'confidence': 0,
-                        'source': 'NPI Registry (CMS)',
-                        'error': 'NPI not found in registry',
-                        'verified_data': None,
-                        'matches_input': False
-                    }
-                
-                # Extract provider information from first result
-                result = data.get('results', [{}])[0]
-                
-                # Extract basic information
-                basic_info = result.get('basic', {})
-                name = f"{basic_info.get('first_name', '')} {basic_info.get('last_name', '')}".strip()
-                organization_name = basic_info.get('organization_name', '')
-                
-                # Extract taxonomy (specialty)
-                taxonomies = result.get('taxonomies', [])
-                primary_taxonomy = taxonomies[0] if taxonomies else {}
-                specialty = primary_taxonomy.get('desc', '')
-                
-                # Extract addresses
-                addresses = result.get('addresses', [])
-                primary_address = addresses[0] if addresses else {}
-                
-                # Extract phone
-                phone = basic_info.get('telephone_number', '')
-                
-                verified_data = {
-                    'npi': npi,
-                    'name': name or organization_name,
-                    'organization_name': organization_name,
-                    'taxonomy': specialty,
-                    'address': {
-                        'address_1': primary_address.get('address_1', ''),
-                        'city': primary_address.get('city', ''),
-                        'state': primary_address.get('state', ''),
-                        'postal_code': primary_address.get('postal_code', ''),
-                        'country_code': primary_address.get('country_code', '')
-                    },
-                    'phone': phone,
-                    'enumeration_type': result.get('enumeration_type', ''),
-                    'status': basic_info.get('status', '')
-                }
-                
-                return {
-                    'valid': True,
-                    'confidence': 100,
-                    'source': 'NPI Registry (CMS)',
-                    'verified_data': verified_data,
-                    'matches_input': True,
-                    'error': None
-                }
-                
-            except requests.exceptions.RequestException as e:
-                if attempt < self.retry_attempts - 1:
-                    time.sleep(self.retry_delay * (attempt + 1))
-                    continue
-                else:
-                    return {
-                        'valid': False,
-                        'confidence': 0,
-                        'source': 'NPI Registry (CMS)',
-                        'error': f'API request failed: {str(e)}',
-                        'verified_data': None,
-                        'matches_input': False
-                    }
-            except Exception as e:
+        try:
+            response = get_session(retry=True).get(url, timeout=self.timeout)
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+            
+            if data.get('result_count', 0) == 0:
                 return {
                     'valid': False,
                     'confidence': 0,
                     'source': 'NPI Registry (CMS)',
-                    'error': f'Unexpected error: {str(e)}',
+                    'error': 'NPI not found in registry',
                     'verified_data': None,
                     'matches_input': False
                 }
+            
+            # Extract provider information from first result
+            result = data.get('results', [{}])[0]
+            
+            # Extract basic information
+            basic_info = result.get('basic', {})
+            name = f"{basic_info.get('first_name', '')} {basic_info.get('last_name', '')}".strip()
+            organization_name = basic_info.get('organization_name', '')
+            
+            # Extract taxonomy (specialty)
+            taxonomies = result.get('taxonomies', [])
+            primary_taxonomy = taxonomies[0] if taxonomies else {}
+            specialty = primary_taxonomy.get('desc', '')
+            
+            # Extract addresses
+            addresses = result.get('addresses', [])
+            primary_address = addresses[0] if addresses else {}
+            
+            # Extract phone
+            phone = basic_info.get('telephone_number', '')
+            
+            verified_data = {
+                'npi': npi,
+                'name': name or organization_name,
+                'organization_name': organization_name,
+                'taxonomy': specialty,
+                'address': {
+                    'address_1': primary_address.get('address_1', ''),
+                    'city': primary_address.get('city', ''),
+                    'state': primary_address.get('state', ''),
+                    'postal_code': primary_address.get('postal_code', ''),
+                    'country_code': primary_address.get('country_code', '')
+                },
+                'phone': phone,
+                'enumeration_type': result.get('enumeration_type', ''),
+                'status': basic_info.get('status', '')
+            }
+            
+            return {
+                'valid': True,
+                'confidence': 100,
+                'source': 'NPI Registry (CMS)',
+                'verified_data': verified_data,
+                'matches_input': True,
+                'error': None
+            }
+            
+        except requests.exceptions.RequestException as e:
+            # Retries with backoff already happened inside the session adapter
+            return {
+                'valid': False,
+                'confidence': 0,
+                'source': 'NPI Registry (CMS)',
+                'error': f'API request failed: {str(e)}',
+                'verified_data': None,
+                'matches_input': False
+            }
+        except Exception as e:
+            return {
+                'valid': False,
+                'confidence': 0,
+                'source': 'NPI Registry (CMS)',
+                'error': f'Unexpected error: {str(e)}',
+                'verified_data': None,
+                'matches_input': False
+            }
+    
+    def validate_many(self, npis: List[str]) -> List[Dict[str, Any]]:
+        """
+        Validate many NPI numbers with concurrent registry lookups
         
-        return {
-            'valid': False,
-            'confidence': 0,
-            'source': 'NPI Registry (CMS)',
-            'error': 'Max retry attempts exceeded',
-            'verified_data': None,
-            'matches_input': False
-        }
+        Each distinct NPI is looked up once, using up to
+        MAX_CONCURRENT_VALIDATIONS requests in flight on the shared session.
+        
+        Args:
+            npis: NPI numbers, duplicates allowed
+            
+        Returns:
+            One validation result per input NPI, in input order
+        """
+        unique = list(dict.fromkeys(npis))
+        if not unique:
+            return []
+        
+        workers = min(Config.MAX_CONCURRENT_VALIDATIONS, len(unique))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='npi') as pool:
+            by_npi = dict(zip(unique, pool.map(self.validate_npi, unique)))
+        
+        # Repeated NPIs get their own copy, like separate cached lookups would
+        results = []
+        seen = set()
+        for npi in npis:
+            result = by_npi[npi]
+            results.append(copy.deepcopy(result) if npi in seen else result)
+            seen.add(npi)
+        return results
     
     def compare_with_input(self, npi_result: Dict[str, Any], input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -153,35 +198,41 @@ class NPIService:
         matches = True
         confidence = 100
         
-        # Compare name
-        verified_name = verified_data.get('name', '').lower().strip()
-        input_name = input_data.get('full_name', '').lower().strip()
+        # Compare name (fields missing on either side are skipped before
+        # any normalization)
+        verified_name = verified_data.get('name')
+        input_name = input_data.get('full_name')
         
         if verified_name and input_name:
-            # Simple name matching (can be enhanced with fuzzy matching)
-            if verified_name not in input_name and input_name not in verified_name:
+            verified_name = verified_name.lower().strip()
+            input_name = input_name.lower().strip()
+            # Substring match, else token-set similarity so reordered names
+            # ("smith john") and extra middle names/suffixes still match
+            if (verified_name and input_name
+                    and verified_name not in input_name and input_name not in verified_name
+                    and fuzz.token_set_ratio(verified_name, input_name) <= 80):
                 matches = False
                 confidence = 60  # Name mismatch
         
         # Compare address
         verified_addr = verified_data.get('address', {})
-        input_city = input_data.get('city', '').lower().strip()
-        input_state = input_data.get('state', '').lower().strip()
-        input_zip = input_data.get('zip_code', '').strip()
-        
-        verified_city = verified_addr.get('city', '').lower().strip()
-        verified_state = verified_addr.get('state', '').lower().strip()
-        verified_zip = verified_addr.get('postal_code', '').strip()
+        verified_city = verified_addr.get('city')
+        input_city = input_data.get('city')
         
         if verified_city and input_city:
-            if verified_city != input_city or verified_state != input_state:
-                matches = False
-                if confidence > 60:
-                    confidence = 60
+            verified_city = verified_city.lower().strip()
+            input_city = input_city.lower().strip()
+            if verified_city and input_city:
+                verified_state = verified_addr.get('state', '').lower().strip()
+                input_state = input_data.get('state', '').lower().strip()
+                if verified_city != input_city or verified_state != input_state:
+                    matches = False
+                    if confidence > 60:
+                        confidence = 60
         
         # Compare phone (basic)
-        verified_phone = verified_data.get('phone', '').replace('-', '').replace(' ', '').replace('(', '').replace(')', '')
-        input_phone = input_data.get('phone', '').replace('-', '').replace(' ', '').replace('(', '').replace(')', '')
+        verified_phone = digits_only(verified_data.get('phone', ''))
+        input_phone = digits_only(input_data.get('phone', ''))
         
         if verified_phone and input_phone:
             if verified_phone[-10:] != input_phone[-10:]:  # Compare last 10 digits
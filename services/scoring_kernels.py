@@ -0,0 +1,37 @@
+"""
+Numeric kernels for confidence scoring
+
+The weighted combination of the per-source confidences is compiled with
+Numba when it is installed; without it the same functions run as plain
+Python/NumPy, so callers never need to check.
+"""
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; the kernels below also run as plain Python
+    prange = range
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def combine_scores(npi: float, address: float, phone: float, web: float,
+                   npi_weight: float, address_weight: float,
+                   phone_weight: float, web_weight: float) -> float:
+    """Weighted sum of the four source confidences (same term order as MLModels)"""
+    return npi * npi_weight + address * address_weight + phone * phone_weight + web * web_weight
+
+
+@njit(cache=True, parallel=True)
+def batch_combine(scores: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Row-wise combine_scores over an (N, 4) array of npi/address/phone/web confidences"""
+    n = scores.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    for i in prange(n):
+        out[i] = (scores[i, 0] * weights[0] + scores[i, 1] * weights[1] +
+                  scores[i, 2] * weights[2] + scores[i, 3] * weights[3])
+    return out
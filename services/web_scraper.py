@@ -1,16 +1,55 @@
 """
 Web Scraping Service for provider website verification
 """
-import requests
 from bs4 import BeautifulSoup
 import time
-import sys
-import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
-from difflib import SequenceMatcher
+from rapidfuzz import fuzz
 import re
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import Config
+from services.http import get_session
+from services.cache import get_api_cache
+from services.phone_service import digits_only
+
+try:
+    import lxml  # noqa: F401
+    _HTML_PARSER = 'lxml'
+except ImportError:  # lxml is optional; fall back to the pure-Python stdlib parser
+    _HTML_PARSER = 'html.parser'
+
+
+# Page-scanning patterns, compiled once. Digit classes are ASCII-only;
+# \s stays Unicode-aware because page text often carries &nbsp; (\xa0)
+_PHONE_RE = re.compile(r'\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}')
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_COPYRIGHT_RE = re.compile(r'©|Copyright')
+_YEAR_RE = re.compile(r'20[0-9]{2}')
+_ADDRESS_KEYWORD_RE = re.compile(r'address|location|office|clinic', re.IGNORECASE)
+
+# Contact details live in the first part of a page; anything beyond this is
+# not downloaded or parsed
+MAX_PAGE_BYTES = 1024 * 1024
+# Stop scanning page text once this many phones, emails and addresses are found
+MAX_CANDIDATES = 5
+
+
+_probe_executor = None
+_probe_executor_lock = threading.Lock()
+
+
+def _get_probe_executor() -> ThreadPoolExecutor:
+    """Pool for probing a provider's candidate URLs side by side"""
+    global _probe_executor
+    if _probe_executor is None:
+        with _probe_executor_lock:
+            if _probe_executor is None:
+                _probe_executor = ThreadPoolExecutor(
+                    max_workers=3 * Config.MAX_CONCURRENT_VALIDATIONS,
+                    thread_name_prefix='url-probe'
+                )
+    return _probe_executor
 
 
 class WebScraper:
@@ -44,8 +83,11 @@ class WebScraper:
             f"https://www.{name_slug}md.com"
         ]
         
-        for url in potential_urls:
-            if self._check_url_exists(url):
+        # Probe all candidates at once, but keep the list's order of preference
+        executor = _get_probe_executor()
+        futures = [executor.submit(self._check_url_exists, url) for url in potential_urls]
+        for url, future in zip(potential_urls, futures):
+            if future.result():
                 return url
         
         return None
@@ -53,11 +95,30 @@ class WebScraper:
     def _check_url_exists(self, url: str) -> bool:
         """Check if URL exists and is accessible"""
         try:
-            response = requests.get(url, headers=self.headers, timeout=self.timeout, allow_redirects=True)
+            # HEAD avoids downloading the page; servers that reject the method
+            # get a streamed GET whose body is never read
+            session = get_session()
+            response = session.head(url, headers=self.headers, timeout=self.timeout, allow_redirects=True)
+            if response.status_code in (405, 501):
+                with session.get(url, headers=self.headers, timeout=self.timeout,
+                                 allow_redirects=True, stream=True) as response:
+                    return response.status_code == 200
             return response.status_code == 200
         except:
             return False
     
+    @staticmethod
+    def _read_capped(response) -> bytes:
+        """Read at most MAX_PAGE_BYTES of a streamed response body"""
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= MAX_PAGE_BYTES:
+                break
+        return b''.join(chunks)[:MAX_PAGE_BYTES]
+    
     def extract_contact_info(self, url: str) -> Dict[str, Any]:
         """
         Extract contact information from provider website
@@ -69,42 +130,52 @@ class WebScraper:
             Dictionary with extracted contact information
         """
         try:
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            # Revalidate a previously parsed page instead of re-downloading it
+            cache = get_api_cache()
+            cached = cache.get('web_page', url)
+            headers = dict(self.headers)
+            if cached:
+                if cached.get('etag'):
+                    headers['If-None-Match'] = cached['etag']
+                if cached.get('last_modified'):
+                    headers['If-Modified-Since'] = cached['last_modified']
             
-            # Extract phone numbers
-            phone_pattern = re.compile(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
-            phones = []
-            for text in soup.stripped_strings:
-                matches = phone_pattern.findall(text)
-                phones.extend(matches)
+            with get_session().get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+                if cached and response.status_code == 304:
+                    return cached['contact_info']
+                response.raise_for_status()
+                content = self._read_capped(response)
+                validators = {
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified')
+                }
             
-            # Extract addresses (look for common address patterns)
-            addresses = []
-            address_keywords = ['address', 'location', 'office', 'clinic']
-            for element in soup.find_all(['p', 'div', 'span']):
-                text = element.get_text().lower()
-                if any(keyword in text for keyword in address_keywords):
-                    addresses.append(element.get_text().strip())
+            soup = BeautifulSoup(content, _HTML_PARSER)
             
-            # Extract email
-            email_pattern = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+            # Extract phone numbers, emails and addresses (text mentioning a
+            # common address keyword) in one pass over the page text. Contact
+            # details sit near the top or in a single footer block, so the
+            # walk stops once every kind has a few candidates.
+            phones = []
             emails = []
+            addresses = []
             for text in soup.stripped_strings:
-                matches = email_pattern.findall(text)
-                emails.extend(matches)
+                phones.extend(_PHONE_RE.findall(text))
+                emails.extend(_EMAIL_RE.findall(text))
+                if _ADDRESS_KEYWORD_RE.search(text):
+                    addresses.append(text)
+                if min(len(phones), len(emails), len(addresses)) >= MAX_CANDIDATES:
+                    break
             
             # Try to find last updated date
             last_updated = None
-            copyright_text = soup.find(string=re.compile(r'©|Copyright|©'))
+            copyright_text = soup.find(string=_COPYRIGHT_RE)
             if copyright_text:
-                year_match = re.search(r'20\d{2}', copyright_text)
+                year_match = _YEAR_RE.search(copyright_text)
                 if year_match:
                     last_updated = year_match.group()
             
-            return {
+            contact_info = {
                 'url': url,
                 'phone_on_site': phones[0] if phones else None,
                 'address_on_site': addresses[0] if addresses else None,
@@ -113,6 +184,10 @@ class WebScraper:
                 'phones_found': phones,
                 'addresses_found': addresses
             }
+            # Only pages the server can revalidate are worth keeping
+            if validators['etag'] or validators['last_modified']:
+                cache.set('web_page', url, {**validators, 'contact_info': contact_info})
+            return contact_info
             
         except Exception as e:
             return {
@@ -172,8 +247,8 @@ class WebScraper:
         
         # Compare phone
         if input_phone and contact_info.get('phone_on_site'):
-            input_clean = re.sub(r'\D', '', input_phone)
-            site_clean = re.sub(r'\D', '', contact_info['phone_on_site'])
+            input_clean = digits_only(input_phone)
+            site_clean = digits_only(contact_info['phone_on_site'])
             if input_clean[-10:] == site_clean[-10:]:
                 confidence = 75
                 matches.append('phone')
@@ -182,7 +257,9 @@ class WebScraper:
         if input_address and contact_info.get('address_on_site'):
             input_lower = input_address.lower()
             site_lower = contact_info['address_on_site'].lower()
-            similarity = SequenceMatcher(None, input_lower, site_lower).ratio()
+            # The site text usually wraps the address in a label or extra
+            # lines, so score the best-aligned substring
+            similarity = fuzz.partial_ratio(input_lower, site_lower) / 100.0
             if similarity > 0.7:
                 confidence = max(confidence, 75)
                 matches.append('address')
@@ -1,10 +1,8 @@
 """
 Confidence scoring utilities
 """
-from typing import Dict, Any
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from typing import Dict, Any, List
+import numpy as np
 from services.ml_models import MLModels
 
 
@@ -48,4 +46,41 @@ class ConfidenceScorer:
             validation_result['validation_status'] = 'FLAGGED'
         
         return validation_result
-
+    
+    def score_many(self, validation_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Batch version of score_validation_result
+        
+        Overall confidences and statuses are computed for all results at
+        once; anomalies and recommendations are still built per result.
+        
+        Args:
+            validation_results: Validation result dictionaries
+            
+        Returns:
+            The same dictionaries, updated in place, in input order
+        """
+        if not validation_results:
+            return validation_results
+        
+        overall = self.ml_models.calculate_overall_confidence_batch(
+            [r.get('validations', {}) for r in validation_results]
+        )
+        has_flags = np.array([bool(r.get('flags')) for r in validation_results])
+        statuses = np.where(
+            (overall >= 80) & ~has_flags, 'VALIDATED',
+            np.where(overall >= 60, 'PARTIAL', 'FLAGGED')
+        )
+        
+        rows = zip(validation_results, overall.tolist(), statuses.tolist())
+        for validation_result, overall_confidence, status in rows:
+            validation_result['overall_confidence'] = overall_confidence
+            
+            anomalies = self.ml_models.detect_anomalies(validation_result)
+            if anomalies:
+                validation_result['anomalies'] = anomalies
+            
+            validation_result['recommendations'] = self.ml_models.generate_recommendations(validation_result)
+            validation_result['validation_status'] = status
+        
+        return validation_results
@@ -2,41 +2,119 @@
 Database utilities for SQLite operations
 """
 import sqlite3
+import threading
 import json
+import operator
+import orjson
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from contextlib import contextmanager
-import os
-import sys
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import Config
 
+try:
+    import zstandard
+except ImportError:  # zstandard is optional; validation JSON is then stored as plain TEXT
+    zstandard = None
+
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# Smaller payloads ('[]', short flag lists) would only grow when compressed
+_COMPRESS_MIN_BYTES = 256
+
+# zstd (de)compressor objects are reusable but not safe to share across threads
+_zstd_local = threading.local()
+
+
+def _dumps(value: Any) -> str:
+    """Serialize a JSON column value (NaN/inf are stored as null)"""
+    return orjson.dumps(value, option=_ORJSON_OPTIONS).decode()
+
+
+def _dumps_compressed(value: Any):
+    """Serialize a validation JSON column, zstd-compressed to a BLOB when worthwhile
+
+    Columns keep their TEXT declaration: SQLite stores BLOB values in them
+    unchanged, so compressed and plain rows coexist and _loads tells them
+    apart by type.
+    """
+    raw = orjson.dumps(value, option=_ORJSON_OPTIONS)
+    if zstandard is None or len(raw) < _COMPRESS_MIN_BYTES:
+        return raw.decode()
+    compressor = getattr(_zstd_local, 'compressor', None)
+    if compressor is None:
+        compressor = _zstd_local.compressor = zstandard.ZstdCompressor(level=3)
+    return compressor.compress(raw)
+
+
+def _decompress(blob: bytes) -> bytes:
+    if zstandard is None:
+        raise RuntimeError('Validation data is zstd-compressed; install zstandard to read it')
+    decompressor = getattr(_zstd_local, 'decompressor', None)
+    if decompressor is None:
+        decompressor = _zstd_local.decompressor = zstandard.ZstdDecompressor()
+    return decompressor.decompress(blob)
+
+
+def _loads(text: Any) -> Any:
+    """Parse a JSON column value (TEXT, or a zstd-compressed BLOB)"""
+    if isinstance(text, bytes):
+        text = _decompress(text)
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        # Rows written by the stdlib encoder may contain bare NaN/Infinity
+        return json.loads(text)
+
 
 class Database:
     """SQLite database operations"""
     
     def __init__(self, db_path: str = None):
         self.db_path = db_path or Config.DATABASE_PATH
+        # One cached connection per thread (sqlite3 connections are not shareable)
+        self._local = threading.local()
         self.init_database()
     
+    def _conn(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening and configuring it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            # WAL (set once in init_database) is durable with NORMAL sync
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            conn.execute('PRAGMA cache_size=-64000')
+            # Serve reads from a memory map instead of read() syscalls
+            conn.execute('PRAGMA mmap_size=268435456')
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """Close this thread's cached connection (reopened on next use)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.conn = None
+            conn.close()
+
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        """Context manager for a unit of work on this thread's cached connection"""
+        conn = self._conn()
         try:
             yield conn
             conn.commit()
         except Exception as e:
             conn.rollback()
             raise e
-        finally:
-            conn.close()
     
     def init_database(self):
         """Initialize database tables"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            # Persistent for the database file; lets readers run during writes
+            cursor.execute('PRAGMA journal_mode=WAL')
             
             # Providers table
             cursor.execute('''
@@ -54,6 +132,7 @@ class Database:
                     phone TEXT,
                     email TEXT,
                     website TEXT,
+                    job_id TEXT,
                     created_at TEXT,
                     updated_at TEXT
                 )
@@ -72,6 +151,7 @@ class Database:
                     flags TEXT,
                     recommendations TEXT,
                     sources_used TEXT,
+                    job_id TEXT,
                     FOREIGN KEY (provider_id) REFERENCES providers(provider_id)
                 )
             ''')
@@ -110,91 +190,223 @@ class Database:
                 )
             ''')
             
+            # Databases created before job tracking lack the job_id columns
+            for table in ('providers', 'validation_results'):
+                columns = {row['name'] for row in cursor.execute(f'PRAGMA table_info({table})')}
+                if 'job_id' not in columns:
+                    cursor.execute(f'ALTER TABLE {table} ADD COLUMN job_id TEXT')
+            
+            # Latest-result lookups per provider (get_validation_result and
+            # the bulk result queries) walk this index instead of the table
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_vr_provider
+                ON validation_results(provider_id, validation_timestamp)
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_vr_job ON validation_results(job_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_vr_timestamp ON validation_results(validation_timestamp)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_providers_job ON providers(job_id)')
+            # Flag queries filter on resolved (flagged page, dashboard counts)
+            # or provider, newest first
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_flags_provider ON flags(provider_id, created_at)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_flags_resolved ON flags(resolved, created_at)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_flags_resolved_type ON flags(resolved, flag_type)')
+            # Refresh planner statistics where they are missing or stale
+            cursor.execute('PRAGMA optimize')
+            
             conn.commit()
     
+    # Upsert in place (OR REPLACE would delete and re-insert the row);
+    # a re-imported provider keeps its original created_at
+    _INSERT_PROVIDER_SQL = '''
+        INSERT INTO providers
+        (provider_id, npi, first_name, last_name, full_name, specialty,
+         practice_address, city, state, zip_code, phone, email, website,
+         job_id, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(provider_id) DO UPDATE SET
+            npi = excluded.npi,
+            first_name = excluded.first_name,
+            last_name = excluded.last_name,
+            full_name = excluded.full_name,
+            specialty = excluded.specialty,
+            practice_address = excluded.practice_address,
+            city = excluded.city,
+            state = excluded.state,
+            zip_code = excluded.zip_code,
+            phone = excluded.phone,
+            email = excluded.email,
+            website = excluded.website,
+            job_id = excluded.job_id,
+            updated_at = excluded.updated_at
+    '''
+    
+    @staticmethod
+    def _provider_row(provider: Dict[str, Any], now: str) -> tuple:
+        return (
+            provider['provider_id'],
+            provider.get('npi', ''),
+            provider.get('first_name', ''),
+            provider.get('last_name', ''),
+            provider.get('full_name', ''),
+            provider.get('specialty', ''),
+            provider.get('practice_address', ''),
+            provider.get('city', ''),
+            provider.get('state', ''),
+            provider.get('zip_code', ''),
+            provider.get('phone', ''),
+            provider.get('email', ''),
+            provider.get('website', ''),
+            provider.get('job_id'),
+            now,
+            now
+        )
+    
     def insert_provider(self, provider: Dict[str, Any]) -> bool:
         """Insert or update provider"""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT OR REPLACE INTO providers 
-                    (provider_id, npi, first_name, last_name, full_name, specialty,
-                     practice_address, city, state, zip_code, phone, email, website,
-                     created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    provider['provider_id'],
-                    provider.get('npi', ''),
-                    provider.get('first_name', ''),
-                    provider.get('last_name', ''),
-                    provider.get('full_name', ''),
-                    provider.get('specialty', ''),
-                    provider.get('practice_address', ''),
-                    provider.get('city', ''),
-                    provider.get('state', ''),
-                    provider.get('zip_code', ''),
-                    provider.get('phone', ''),
-                    provider.get('email', ''),
-                    provider.get('website', ''),
-                    datetime.now().isoformat(),
-                    datetime.now().isoformat()
-                ))
+                cursor.execute(self._INSERT_PROVIDER_SQL,
+                               self._provider_row(provider, datetime.now().isoformat()))
                 return True
         except Exception as e:
             print(f"Error inserting provider: {e}")
             return False
     
+    def insert_providers_bulk(self, providers: List[Dict[str, Any]]) -> bool:
+        """Insert or update many providers in a single transaction"""
+        if not providers:
+            return True
+        try:
+            now = datetime.now().isoformat()
+            with self.get_connection() as conn:
+                conn.executemany(self._INSERT_PROVIDER_SQL,
+                                 [self._provider_row(p, now) for p in providers])
+                return True
+        except Exception as e:
+            print(f"Error inserting providers: {e}")
+            return False
+    
+    _PROVIDER_FIELDS = ('provider_id', 'npi', 'first_name', 'last_name', 'full_name', 'specialty',
+                        'practice_address', 'city', 'state', 'zip_code', 'phone', 'email', 'website')
+    
+    def insert_providers_bulk_from_df(self, df, job_id: str = None) -> bool:
+        """Insert or update providers straight from a parsed DataFrame
+
+        Equivalent to insert_providers_bulk(df.to_dict('records')) with job_id
+        set on every row, but builds the parameter tuples column-wise via
+        itertuples instead of allocating a dict per row.
+        """
+        if df.empty:
+            return True
+        if 'provider_id' not in df.columns:
+            print("Error inserting providers: 'provider_id'")
+            return False
+        try:
+            now = datetime.now().isoformat()
+            # to_dict keeps the last of duplicated column names; match it
+            frame = df.loc[:, ~df.columns.duplicated(keep='last')]
+            frame = frame.reindex(columns=list(self._PROVIDER_FIELDS), fill_value='')
+            frame['job_id'] = job_id
+            frame['created_at'] = now
+            frame['updated_at'] = now
+            with self.get_connection() as conn:
+                conn.executemany(self._INSERT_PROVIDER_SQL, frame.itertuples(index=False, name=None))
+                return True
+        except Exception as e:
+            print(f"Error inserting providers: {e}")
+            return False
+    
+    _INSERT_VALIDATION_SQL = '''
+        INSERT INTO validation_results
+        (provider_id, validation_timestamp, validation_duration_seconds,
+         overall_confidence, validation_status, validations, flags,
+         recommendations, sources_used, job_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    # Column values pulled from a result dict in one C-level call each
+    _validation_scalars = operator.itemgetter(
+        'provider_id', 'validation_timestamp', 'validation_duration_seconds',
+        'overall_confidence', 'validation_status'
+    )
+    _validation_json = operator.itemgetter('validations', 'flags', 'recommendations', 'sources_used')
+    
+    @classmethod
+    def _validation_row(cls, result: Dict[str, Any]) -> tuple:
+        return (
+            *cls._validation_scalars(result),
+            *map(_dumps_compressed, cls._validation_json(result)),
+            result.get('job_id')
+        )
+    
     def insert_validation_result(self, result: Dict[str, Any]) -> bool:
         """Insert validation result"""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO validation_results
-                    (provider_id, validation_timestamp, validation_duration_seconds,
-                     validations, overall_confidence, validation_status, flags,
-                     recommendations, sources_used)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    result['provider_id'],
-                    result['validation_timestamp'],
-                    result['validation_duration_seconds'],
-                    json.dumps(result['validations']),
-                    result['overall_confidence'],
-                    result['validation_status'],
-                    json.dumps(result['flags']),
-                    json.dumps(result['recommendations']),
-                    json.dumps(result['sources_used'])
-                ))
+                cursor.execute(self._INSERT_VALIDATION_SQL, self._validation_row(result))
                 return True
         except Exception as e:
             print(f"Error inserting validation result: {e}")
             return False
     
+    def insert_validation_results_bulk(self, results: List[Dict[str, Any]]) -> bool:
+        """Insert many validation results in a single transaction"""
+        if not results:
+            return True
+        try:
+            with self.get_connection() as conn:
+                conn.executemany(self._INSERT_VALIDATION_SQL,
+                                 [self._validation_row(r) for r in results])
+                return True
+        except Exception as e:
+            print(f"Error inserting validation results: {e}")
+            return False
+    
+    _INSERT_FLAG_SQL = '''
+        INSERT INTO flags
+        (provider_id, flag_type, severity, field, message, details, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    @staticmethod
+    def _flag_row(flag: Dict[str, Any], now: str) -> tuple:
+        return (
+            flag['provider_id'],
+            flag['flag_type'],
+            flag['severity'],
+            flag['field'],
+            flag['message'],
+            _dumps(flag.get('details', {})),
+            flag.get('created_at', now)
+        )
+    
     def insert_flag(self, flag: Dict[str, Any]) -> bool:
         """Insert flag"""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO flags
-                    (provider_id, flag_type, severity, field, message, details, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    flag['provider_id'],
-                    flag['flag_type'],
-                    flag['severity'],
-                    flag['field'],
-                    flag['message'],
-                    json.dumps(flag.get('details', {})),
-                    flag.get('created_at', datetime.now().isoformat())
-                ))
+                cursor.execute(self._INSERT_FLAG_SQL,
+                               self._flag_row(flag, datetime.now().isoformat()))
                 return True
         except Exception as e:
             print(f"Error inserting flag: {e}")
             return False
     
+    def insert_flags_bulk(self, flags: List[Dict[str, Any]]) -> bool:
+        """Insert many flags in a single transaction"""
+        if not flags:
+            return True
+        try:
+            now = datetime.now().isoformat()
+            with self.get_connection() as conn:
+                conn.executemany(self._INSERT_FLAG_SQL, [self._flag_row(f, now) for f in flags])
+                return True
+        except Exception as e:
+            print(f"Error inserting flags: {e}")
+            return False
+    
     def get_provider(self, provider_id: str) -> Optional[Dict[str, Any]]:
         """Get provider by ID"""
         with self.get_connection() as conn:
@@ -217,14 +429,97 @@ class Database:
             ''', (provider_id,))
             row = cursor.fetchone()
             if row:
-                result = dict(row)
-                result['validations'] = json.loads(result['validations'])
-                result['flags'] = json.loads(result['flags'])
-                result['recommendations'] = json.loads(result['recommendations'])
-                result['sources_used'] = json.loads(result['sources_used'])
-                return result
+                return self._decode_validation_row(row)
             return None
     
+    @staticmethod
+    def _decode_validation_row(row: sqlite3.Row) -> Dict[str, Any]:
+        result = dict(row)
+        result['validations'] = _loads(result['validations'])
+        result['flags'] = _loads(result['flags'])
+        result['recommendations'] = _loads(result['recommendations'])
+        result['sources_used'] = _loads(result['sources_used'])
+        return result
+    
+    # Latest validation_results row per provider, providers newest first
+    _LATEST_RESULTS_SQL = '''
+        SELECT v.* FROM providers p
+        JOIN validation_results v ON v.id = (
+            SELECT v2.id FROM validation_results v2
+            WHERE v2.provider_id = p.provider_id
+            ORDER BY v2.validation_timestamp DESC
+            LIMIT 1
+        )
+        ORDER BY p.created_at DESC
+    '''
+    
+    def get_latest_validation_results(self, limit: int = None) -> List[Dict[str, Any]]:
+        """Get the latest validation result of every provider in one query"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            if limit is None:
+                cursor.execute(self._LATEST_RESULTS_SQL)
+            else:
+                cursor.execute(self._LATEST_RESULTS_SQL + ' LIMIT ?', (limit,))
+            return [self._decode_validation_row(row) for row in cursor.fetchall()]
+    
+    def get_recent_validation_results(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get the most recent validation results (index-ordered, no table scan)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT * FROM validation_results
+                ORDER BY validation_timestamp DESC
+                LIMIT ?
+            ''', (limit,))
+            return [self._decode_validation_row(row) for row in cursor.fetchall()]
+    
+    # Latest result per provider within one job
+    _JOB_RESULTS_SQL = '''
+        FROM validation_results v
+        WHERE v.job_id = ? AND v.id = (
+            SELECT v2.id FROM validation_results v2
+            WHERE v2.provider_id = v.provider_id AND v2.job_id = v.job_id
+            ORDER BY v2.validation_timestamp DESC
+            LIMIT 1
+        )
+    '''
+    
+    def get_results_for_job(self, job_id: str) -> List[Dict[str, Any]]:
+        """Get the latest validation result of each provider processed by a job"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT v.* ' + self._JOB_RESULTS_SQL + ' ORDER BY v.id', (job_id,))
+            return [self._decode_validation_row(row) for row in cursor.fetchall()]
+    
+    def count_results_for_job(self, job_id: str) -> int:
+        """Number of providers with a validation result for a job"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COUNT(*) ' + self._JOB_RESULTS_SQL, (job_id,))
+            return cursor.fetchone()[0]
+    
+    def get_job_results_version(self, job_id: str) -> tuple:
+        """(row count, newest row id) of a job's validation results; changes on every insert"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COUNT(*), MAX(id) FROM validation_results WHERE job_id = ?', (job_id,))
+            return tuple(cursor.fetchone())
+    
+    def get_validation_kpis(self) -> Dict[str, Any]:
+        """Provider count plus validated count / average confidence over latest results"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT
+                    (SELECT COUNT(*) FROM providers) AS total_providers,
+                    COUNT(*) AS result_count,
+                    COALESCE(SUM(CASE WHEN validation_status = 'VALIDATED' THEN 1 ELSE 0 END), 0) AS validated,
+                    COALESCE(AVG(overall_confidence), 0) AS average_confidence
+                FROM ({self._LATEST_RESULTS_SQL})
+            ''')
+            return dict(cursor.fetchone())
+    
     def get_flags(self, provider_id: str = None, flag_type: str = None, resolved: bool = None) -> List[Dict[str, Any]]:
         """Get flags with optional filters"""
         with self.get_connection() as conn:
@@ -251,10 +546,30 @@ class Database:
             flags = []
             for row in rows:
                 flag = dict(row)
-                flag['details'] = json.loads(flag['details']) if flag['details'] else {}
+                flag['details'] = _loads(flag['details']) if flag['details'] else {}
                 flags.append(flag)
             return flags
     
+    def count_flags_by_type(self, resolved: bool = None) -> Dict[str, int]:
+        """Count flags per flag_type, optionally filtered by resolved state"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            query = 'SELECT flag_type, COUNT(*) FROM flags'
+            params = []
+            if resolved is not None:
+                query += ' WHERE resolved = ?'
+                params.append(1 if resolved else 0)
+            query += ' GROUP BY flag_type'
+            cursor.execute(query, params)
+            return {flag_type: count for flag_type, count in cursor.fetchall()}
+    
+    def count_providers(self) -> int:
+        """Number of providers in the directory"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COUNT(*) FROM providers')
+            return cursor.fetchone()[0]
+    
     def create_job(self, job: Dict[str, Any]) -> bool:
         """Create processing job"""
         try:
@@ -280,20 +595,28 @@ class Database:
             print(f"Error creating job: {e}")
             return False
     
+    # Columns update_job may set; keys are interpolated into the SQL
+    _JOB_UPDATE_FIELDS = frozenset({
+        'filename', 'total_providers', 'status', 'processed_count', 'success_count',
+        'error_count', 'started_at', 'completed_at', 'error_message'
+    })
+    
     def update_job(self, job_id: str, updates: Dict[str, Any]) -> bool:
         """Update processing job"""
+        unknown = updates.keys() - self._JOB_UPDATE_FIELDS
+        if unknown:
+            print(f"Error updating job: unknown fields {sorted(unknown)}")
+            return False
+        if not updates:
+            return True
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                set_clauses = []
-                params = []
-                
-                for key, value in updates.items():
-                    set_clauses.append(f"{key} = ?")
-                    params.append(value)
-                
+                # Sorted so each field combination maps to one cached statement
+                keys = sorted(updates)
+                params = [updates[key] for key in keys]
                 params.append(job_id)
-                query = f"UPDATE processing_jobs SET {', '.join(set_clauses)} WHERE job_id = ?"
+                query = f"UPDATE processing_jobs SET {', '.join(f'{key} = ?' for key in keys)} WHERE job_id = ?"
                 cursor.execute(query, params)
                 return True
         except Exception as e:
@@ -10,16 +10,26 @@ import os
 import time
 import json
 import logging
-from typing import Tuple, Dict
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Dict, Iterator, List
 
+import orjson
 import pandas as pd
-import requests
 
 from config import Config
+from services.http import get_session
 
 
 LOGGER = logging.getLogger(__name__)
 
+# One stripped OCR line: "key: value" (split at the first colon) or, for
+# lines without a colon, continuation text. Blank lines never match.
+_OCR_LINE_RE = re.compile(
+    r'^[^\S\n]*(?:([^:\n]*?)[^\S\n]*:[^\S\n]*(.*?)|(\S.*?))[^\S\n]*$',
+    re.MULTILINE
+)
+
 
 class FileProcessor:
     """Enhanced file processor that supports remote OCR via OCR.space.
@@ -27,6 +37,9 @@ class FileProcessor:
     Methods:
       - is_supported_format(filename)
       - process_file(file_path) -> (DataFrame, metadata)
+      - process_file_head(file_path, n=1) -> (DataFrame, metadata)
+      - iter_file_chunks(file_path, chunksize) -> DataFrames of up to chunksize rows
+      - process_files_batch(file_paths) -> [(DataFrame, metadata), ...]
     """
 
     SUPPORTED_FORMATS = {
@@ -39,6 +52,12 @@ class FileProcessor:
 
     OCRSPACE_ENDPOINT = 'https://api.ocr.space/parse/image'
 
+    # Rows per DataFrame yielded by iter_file_chunks
+    CHUNK_SIZE = 10_000
+
+    # Files parsed concurrently by process_files_batch
+    BATCH_WORKERS = 8
+
     def __init__(self):
         self.start_time = None
 
@@ -65,6 +84,75 @@ class FileProcessor:
         `Config.OCRSPACE_API_KEY` is set. Otherwise, will attempt a local
         extraction if supported libraries are installed.
         """
+        return self._process(file_path)
+
+    def process_file_head(self, file_path: str, n: int = 1) -> Tuple[pd.DataFrame, Dict]:
+        """Like process_file, but stop after the first `n` records.
+
+        CSV/Excel are read with `nrows=n`, JSON arrays are sliced before
+        normalizing and local PDF text extraction only reads the first `n`
+        pages. Remote OCR still sends the whole file (one API call).
+        """
+        return self._process(file_path, limit=n)
+
+    @classmethod
+    def process_files_batch(cls, file_paths: List[str]) -> List[Tuple[pd.DataFrame, Dict]]:
+        """Process several files concurrently, returning results in input order.
+
+        Remote OCR round-trips dominate for PDFs/images, so the uploads
+        overlap on the shared pooled session. Each file gets its own
+        processor because the timing state is per instance.
+        """
+        if not file_paths:
+            return []
+        with ThreadPoolExecutor(max_workers=min(cls.BATCH_WORKERS, len(file_paths))) as pool:
+            return list(pool.map(lambda path: cls().process_file(path), file_paths))
+
+    def iter_file_chunks(self, file_path: str, chunksize: int = CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+        """Yield the file's records as standardized DataFrames of at most `chunksize` rows.
+
+        CSV is read with pandas' chunked reader and every column kept as
+        str, so a column cannot change dtype from one chunk to the next.
+        .xlsx is streamed through openpyxl's read-only mode. Other formats
+        are parsed whole by process_file and yielded as a single frame.
+        """
+        ext = self.get_file_extension(file_path)
+        if ext in self.SUPPORTED_FORMATS['csv']:
+            with pd.read_csv(file_path, encoding='utf-8', chunksize=chunksize, dtype=str) as reader:
+                for chunk in reader:
+                    yield self._standardize_columns(chunk)
+        elif ext == 'xlsx':
+            yield from self._iter_xlsx_chunks(file_path, chunksize)
+        else:
+            df, _ = self.process_file(file_path)
+            yield df
+
+    def _iter_xlsx_chunks(self, file_path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+        """Stream the first worksheet without loading the whole workbook."""
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = [f'Unnamed: {i}' if h is None else h for i, h in enumerate(header)]
+            batch = []
+            for row in rows:
+                # Read-only sheets can report formatted-but-empty rows
+                if any(v is not None for v in row):
+                    batch.append(row)
+                if len(batch) >= chunksize:
+                    # object dtype keeps cell values as-is in every chunk
+                    yield self._standardize_columns(pd.DataFrame(batch, columns=columns, dtype=object))
+                    batch = []
+            if batch:
+                yield self._standardize_columns(pd.DataFrame(batch, columns=columns, dtype=object))
+        finally:
+            workbook.close()
+
+    def _process(self, file_path: str, limit: int = None) -> Tuple[pd.DataFrame, Dict]:
         self.start_timer()
 
         ext = self.get_file_extension(file_path)
@@ -73,12 +161,13 @@ class FileProcessor:
 
         try:
             if ext in self.SUPPORTED_FORMATS['csv']:
-                df = pd.read_csv(file_path, encoding='utf-8')
+                df = pd.read_csv(file_path, encoding='utf-8', nrows=limit)
             elif ext in self.SUPPORTED_FORMATS['excel']:
-                df = pd.read_excel(file_path)
+                df = pd.read_excel(file_path, nrows=limit)
             elif ext in self.SUPPORTED_FORMATS['json']:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                data = self._read_json(file_path)
+                if limit is not None and isinstance(data, list):
+                    data = data[:limit]
                 df = pd.json_normalize(data)
             elif ext in self.SUPPORTED_FORMATS['pdf']:
                 # Prefer remote OCR for PDFs
@@ -90,7 +179,8 @@ class FileProcessor:
                     try:
                         from PyPDF2 import PdfReader
                         reader = PdfReader(file_path)
-                        text = "\n".join([p.extract_text() or '' for p in reader.pages])
+                        pages = reader.pages if limit is None else reader.pages[:limit]
+                        text = "\n".join([p.extract_text() or '' for p in pages])
                         if text.strip():
                             df = self._text_to_dataframe(text)
                         else:
@@ -106,6 +196,9 @@ class FileProcessor:
             else:
                 raise ValueError(f'Unsupported file format: {ext}')
 
+            if limit is not None:
+                df = df.head(limit)
+
             # Standardize columns where possible
             df = self._standardize_columns(df)
 
@@ -124,6 +217,17 @@ class FileProcessor:
             LOGGER.exception('Error processing file')
             raise
 
+    @staticmethod
+    def _read_json(file_path: str):
+        """Read a JSON file with one bulk read and parse it with orjson."""
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # stdlib accepts NaN/Infinity literals and a UTF-8 BOM
+            return json.loads(raw.decode('utf-8-sig'))
+
     def _remote_ocr(self, file_path: str) -> str:
         """Send file to OCR.space API and return extracted text.
 
@@ -140,7 +244,7 @@ class FileProcessor:
                 'language': 'eng',
                 'isOverlayRequired': False
             }
-            resp = requests.post(self.OCRSPACE_ENDPOINT, files=files, data=data, timeout=60)
+            resp = get_session().post(self.OCRSPACE_ENDPOINT, files=files, data=data, timeout=60)
             resp.raise_for_status()
             result = resp.json()
 
@@ -160,32 +264,25 @@ class FileProcessor:
         from OCR. The resulting DataFrame will have one row when parsing
         key:value pairs, or multiple rows if repetitive structures are found.
         """
-        lines = [l.strip() for l in text.splitlines() if l.strip()]
         data = {}
         current_key = None
 
-        for line in lines:
-            if ':' in line:
-                key, val = line.split(':', 1)
-                key = key.strip().lower().replace(' ', '_')
-                val = val.strip()
+        # Joining splitlines() maps every line-break character to \n for the regex
+        for key, val, continuation in _OCR_LINE_RE.findall('\n'.join(text.splitlines())):
+            if not continuation:
+                key = key.lower().replace(' ', '_')
                 data.setdefault(key, []).append(val)
                 current_key = key
             elif current_key:
                 # Append additional text to last key
-                data[current_key][-1] = data[current_key][-1] + ' ' + line
-
-        # Normalize lengths: make each key have same number of rows
-        max_len = max((len(v) for v in data.values()), default=0)
-        for k, v in list(data.items()):
-            if len(v) < max_len:
-                data[k] = v + [''] * (max_len - len(v))
+                data[current_key][-1] = data[current_key][-1] + ' ' + continuation
 
         if not data:
             # Fallback: return a single-row DataFrame with the raw text
             return pd.DataFrame({'ocr_text': [text]})
 
-        return pd.DataFrame(data)
+        # Keys seen fewer times than others are padded with '' in their later rows
+        return pd.DataFrame.from_dict(data, orient='index').T.fillna('')
 
     def _standardize_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         # Normalize column names and map common variants
@@ -204,7 +301,7 @@ class FileProcessor:
             'id': 'provider_id'
         }
 
-        df.columns = [str(c).lower().strip().replace(' ', '_') for c in df.columns]
+        df.columns = df.columns.astype(str).str.lower().str.strip().str.replace(' ', '_', regex=False)
         df = df.rename(columns=mapping)
         return df
 
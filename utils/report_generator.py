@@ -2,7 +2,9 @@
 Report generation utilities for PDF and Excel exports
 """
 import pandas as pd
-from typing import List, Dict, Any
+from collections import Counter
+import xlsxwriter
+from typing import List, Dict, Any, BinaryIO, Union
 from datetime import datetime
 import os
 
@@ -11,13 +13,15 @@ class ReportGenerator:
     """Utility for generating validation reports"""
     
     @staticmethod
-    def generate_excel_report(validation_results: List[Dict[str, Any]], output_path: str):
-        """Generate Excel report from validation results"""
+    def generate_excel_report(validation_results: List[Dict[str, Any]], output_path: Union[str, BinaryIO]):
+        """Generate Excel report from validation results to a path or binary file-like object"""
         try:
             # Prepare data for Excel
             rows = []
             for result in validation_results:
                 validations = result.get('validations', {})
+                flags = result.get('flags', [])
+                flag_types = Counter(f.get('flag_type') for f in flags)
                 row = {
                     'Provider ID': result.get('provider_id', ''),
                     'NPI': result.get('npi', ''),
@@ -31,28 +35,36 @@ class ReportGenerator:
                     'Phone Confidence': validations.get('phone', {}).get('confidence', 0),
                     'Website Valid': validations.get('website', {}).get('valid', False),
                     'Website Confidence': validations.get('website', {}).get('confidence', 0),
-                    'Flag Count': len(result.get('flags', [])),
-                    'Critical Flags': len([f for f in result.get('flags', []) if f.get('flag_type') == 'CRITICAL']),
-                    'Warning Flags': len([f for f in result.get('flags', []) if f.get('flag_type') == 'WARNING']),
+                    'Flag Count': len(flags),
+                    'Critical Flags': flag_types['CRITICAL'],
+                    'Warning Flags': flag_types['WARNING'],
                     'Validation Timestamp': result.get('validation_timestamp', ''),
                     'Duration (seconds)': result.get('validation_duration_seconds', 0)
                 }
                 rows.append(row)
             
-            df = pd.DataFrame(rows)
+            df = pd.DataFrame.from_records(rows)
             
-            # Write to Excel
-            with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Validation Results', index=False)
-                
-                # Auto-adjust column widths
-                worksheet = writer.sheets['Validation Results']
+            # Column widths must be known up front: constant_memory mode
+            # flushes each row to disk as soon as the next one starts
+            value_lengths = df.astype(str).apply(lambda s: s.str.len().max()).fillna(0)
+            
+            # Write to Excel row by row (pandas' to_excel writes column-major,
+            # which constant_memory would silently truncate)
+            workbook = xlsxwriter.Workbook(output_path, {'constant_memory': True})
+            try:
+                worksheet = workbook.add_worksheet('Validation Results')
+                header_format = workbook.add_format({'bold': True, 'border': 1,
+                                                     'align': 'center', 'valign': 'top'})
                 for idx, col in enumerate(df.columns):
-                    max_length = max(
-                        df[col].astype(str).map(len).max(),
-                        len(col)
-                    ) + 2
-                    worksheet.column_dimensions[chr(65 + idx)].width = min(max_length, 50)
+                    max_length = max(value_lengths[col], len(col)) + 2
+                    worksheet.set_column(idx, idx, min(max_length, 50))
+                worksheet.write_row(0, 0, df.columns, header_format)
+                for row_idx, row in enumerate(rows, start=1):
+                    # NaN is written blank, as to_excel did
+                    worksheet.write_row(row_idx, 0, [None if v != v else v for v in row.values()])
+            finally:
+                workbook.close()
             
             return True
         except Exception as e:
@@ -65,24 +77,32 @@ class ReportGenerator:
         if total == 0:
             return {}
         
-        validated = sum(1 for r in validation_results if r.get('validation_status') == 'VALIDATED')
-        partial = sum(1 for r in validation_results if r.get('validation_status') == 'PARTIAL')
-        flagged = sum(1 for r in validation_results if r.get('validation_status') == 'FLAGGED')
-        
-        avg_confidence = sum(r.get('overall_confidence', 0) for r in validation_results) / total
-        
-        total_flags = sum(len(r.get('flags', [])) for r in validation_results)
-        critical_flags = sum(len([f for f in r.get('flags', []) if f.get('flag_type') == 'CRITICAL']) 
-                            for r in validation_results)
-        warning_flags = sum(len([f for f in r.get('flags', []) if f.get('flag_type') == 'WARNING']) 
-                            for r in validation_results)
+        # One pass over the results (and each result's flags) for every metric
+        status_counts = Counter()
+        flag_type_counts = Counter()
+        valid_counts = Counter()
+        confidence_sum = 0
+        total_flags = 0
+        for r in validation_results:
+            status_counts[r.get('validation_status')] += 1
+            confidence_sum += r.get('overall_confidence', 0)
+            flags = r.get('flags', [])
+            total_flags += len(flags)
+            flag_type_counts.update(f.get('flag_type') for f in flags)
+            validations = r.get('validations', {})
+            for check in ('npi', 'address', 'phone'):
+                if validations.get(check, {}).get('valid', False):
+                    valid_counts[check] += 1
         
-        npi_valid_count = sum(1 for r in validation_results 
-                             if r.get('validations', {}).get('npi', {}).get('valid', False))
-        address_valid_count = sum(1 for r in validation_results 
-                                 if r.get('validations', {}).get('address', {}).get('valid', False))
-        phone_valid_count = sum(1 for r in validation_results 
-                              if r.get('validations', {}).get('phone', {}).get('valid', False))
+        validated = status_counts['VALIDATED']
+        partial = status_counts['PARTIAL']
+        flagged = status_counts['FLAGGED']
+        avg_confidence = confidence_sum / total
+        critical_flags = flag_type_counts['CRITICAL']
+        warning_flags = flag_type_counts['WARNING']
+        npi_valid_count = valid_counts['npi']
+        address_valid_count = valid_counts['address']
+        phone_valid_count = valid_counts['phone']
         
         return {
             'total_providers': total,